@@ -0,0 +1,159 @@
+"""
+偏差图形几何计算内核
+
+安装numba时逐点循环内核经JIT编译执行，否则使用等价的NumPy向量化实现。
+两种实现输出相同的数组，调用方只需遍历结果分派COM绘图调用。
+"""
+import math
+import numpy as np
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# 坐标轴及偏差箭头头部与主线的夹角（30度）
+_HEAD_ANGLE = math.pi / 6
+
+def axes_offsets(axis_length: float) -> np.ndarray:
+    """坐标轴多段线顶点相对桩中心的偏移，对所有点位相同，用于定义桩基骨架图块
+    
+    X轴、Y轴及其箭头合并为一条多段线，箭头线段往返绘制。
+    
+    Args:
+        axis_length: 坐标轴长度
+        
+    Returns:
+        np.ndarray: 顶点偏移 (12, 2)
+    """
+    arrow_size = axis_length * 0.1  # 箭头大小为轴长的10%
+    cos30, sin30 = math.cos(_HEAD_ANGLE), math.sin(_HEAD_ANGLE)
+    x_end, y_end = (axis_length, 0.0), (0.0, axis_length)
+    return np.array([
+        (-axis_length, 0.0), x_end,
+        (axis_length - arrow_size * cos30, -arrow_size * sin30),
+        x_end,
+        (axis_length - arrow_size * cos30, arrow_size * sin30),
+        x_end,
+        (0.0, 0.0), (0.0, -axis_length), y_end,
+        (-arrow_size * sin30, axis_length - arrow_size * cos30),
+        y_end,
+        (arrow_size * sin30, axis_length - arrow_size * cos30)
+    ])
+
+def _point_geometry_kernel(pairs, pile_diameter, arrow_scale):
+    """逐点计算偏差图形几何（供numba编译）
+    
+    Args:
+        pairs: (设计点, 实测点)坐标 (N, 2, 2)
+        pile_diameter: 桩基直径
+        arrow_scale: 箭头比例
+        
+    Returns:
+        Tuple[np.ndarray, ...]: 见compute_point_geometry
+    """
+    n = pairs.shape[0]
+    arrows = np.empty((n, 10))
+    text_info = np.empty((n, 6))
+    arcs = np.empty((n, 2))
+    min_length = pile_diameter * 0.25
+    offset_distance = pile_diameter * 0.05
+    for i in range(n):
+        x0 = pairs[i, 0, 0]
+        y0 = pairs[i, 0, 1]
+        dx = pairs[i, 1, 0] - x0
+        dy = pairs[i, 1, 1] - y0
+        deviation = math.hypot(dx, dy) * 1000
+        angle = math.degrees(math.atan2(dy, dx)) % 360.0
+        rad = math.radians(angle)
+        cos_a = math.cos(rad)
+        sin_a = math.sin(rad)
+        length = max(deviation * arrow_scale, min_length)
+        arc_radius = max(min(length * 0.3, pile_diameter * 0.2), pile_diameter * 0.1)
+        head_size = length * 0.2
+        end_x = x0 + length * cos_a
+        end_y = y0 + length * sin_a
+        
+        arrows[i, 0] = x0
+        arrows[i, 1] = y0
+        arrows[i, 2] = end_x
+        arrows[i, 3] = end_y
+        arrows[i, 4] = end_x - head_size * math.cos(rad + _HEAD_ANGLE)
+        arrows[i, 5] = end_y - head_size * math.sin(rad + _HEAD_ANGLE)
+        arrows[i, 6] = end_x
+        arrows[i, 7] = end_y
+        arrows[i, 8] = end_x - head_size * math.cos(rad - _HEAD_ANGLE)
+        arrows[i, 9] = end_y - head_size * math.sin(rad - _HEAD_ANGLE)
+        
+        mid = rad / 2
+        text_info[i, 0] = x0 + arc_radius * 1.3 * math.cos(mid)
+        text_info[i, 1] = y0 + arc_radius * 1.3 * math.sin(mid)
+        text_info[i, 2] = angle
+        text_info[i, 3] = x0 + (length + offset_distance) * cos_a
+        text_info[i, 4] = y0 + (length + offset_distance) * sin_a
+        text_info[i, 5] = deviation
+        
+        arcs[i, 0] = arc_radius
+        arcs[i, 1] = rad
+    return arrows, text_info, arcs
+
+def _point_geometry_numpy(pairs, pile_diameter, arrow_scale):
+    """向量化计算偏差图形几何（未安装numba时使用）
+    
+    Args:
+        pairs: (设计点, 实测点)坐标 (N, 2, 2)
+        pile_diameter: 桩基直径
+        arrow_scale: 箭头比例
+        
+    Returns:
+        Tuple[np.ndarray, ...]: 见compute_point_geometry
+    """
+    n = len(pairs)
+    design = pairs[:, 0, :]
+    delta = pairs[:, 1, :] - design
+    # 偏差转换为毫米（坐标值以米为单位）
+    deviations = np.hypot(delta[:, 0], delta[:, 1]) * 1000
+    # 偏差角度：与X轴的夹角，逆时针为正，取值0~360度
+    angles = np.degrees(np.arctan2(delta[:, 1], delta[:, 0])) % 360.0
+    rad = np.radians(angles)
+    direction = np.column_stack([np.cos(rad), np.sin(rad)])
+    
+    # 箭头长度最小为桩基直径的25%；圆弧半径限制在桩基直径的10%~20%
+    lengths = np.maximum(deviations * arrow_scale, pile_diameter * 0.25)
+    arc_radii = np.maximum(np.minimum(lengths * 0.3, pile_diameter * 0.2), pile_diameter * 0.1)
+    head_size = lengths * 0.2
+    ends = design + lengths[:, None] * direction
+    p1 = ends - head_size[:, None] * np.column_stack([np.cos(rad + _HEAD_ANGLE), np.sin(rad + _HEAD_ANGLE)])
+    p2 = ends - head_size[:, None] * np.column_stack([np.cos(rad - _HEAD_ANGLE), np.sin(rad - _HEAD_ANGLE)])
+    
+    arrows = np.stack([design, ends, p1, ends, p2], axis=1).reshape(n, 10)
+    
+    mid = rad / 2
+    angle_points = design + (arc_radii * 1.3)[:, None] * np.column_stack([np.cos(mid), np.sin(mid)])
+    deviation_points = design + (lengths + pile_diameter * 0.05)[:, None] * direction
+    text_info = np.column_stack([angle_points, angles, deviation_points, deviations])
+    arcs = np.column_stack([arc_radii, rad])
+    return arrows, text_info, arcs
+
+if NUMBA_AVAILABLE:
+    _point_geometry = njit(fastmath=True, cache=True)(_point_geometry_kernel)
+else:
+    _point_geometry = _point_geometry_numpy
+
+def compute_point_geometry(pairs: np.ndarray, pile_diameter: float, arrow_scale: float):
+    """一次性计算所有点位偏差箭头的顶点坐标、角度圆弧和文本信息
+    
+    Args:
+        pairs: (设计点, 实测点)坐标 (N, 2, 2)，float64
+        pile_diameter: 桩基直径
+        arrow_scale: 箭头比例
+        
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray]:
+            arrows: 偏差箭头多段线顶点 (N, 10)，按[x0, y0, x1, y1, ...]展平
+            text_info: (角度文本x, 角度文本y, 角度(度), 偏差文本x, 偏差文本y, 偏差(mm)) (N, 6)
+            arcs: (圆弧半径, 圆弧终止角(弧度)) (N, 2)
+    """
+    pairs = np.ascontiguousarray(pairs, dtype=np.float64)
+    return _point_geometry(pairs, float(pile_diameter), float(arrow_scale))
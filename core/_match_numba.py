@@ -0,0 +1,79 @@
+"""
+按距离匹配点位的Numba加速内核
+
+未安装numba时NUMBA_AVAILABLE为False，各内核为None，调用方应回退到NumPy实现。
+"""
+import numpy as np
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+def _greedy_match(design, measured, max_distance):
+    """按设计点位顺序贪心匹配最近且未被使用的实测点位
+    
+    Args:
+        design: 设计点坐标 (N, 2)
+        measured: 实测点坐标 (M, 2)
+        max_distance: 最大匹配距离，超出距离的实测点位不会被占用
+        
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: (实测点位索引, 距离平方)，无可用实测点位时索引为-1
+    """
+    n = design.shape[0]
+    out = np.full(n, -1, np.int64)
+    best_d2 = np.full(n, np.inf)
+    used = np.zeros(measured.shape[0], np.bool_)
+    for i in range(n):
+        best = np.inf
+        bj = -1
+        for j in range(measured.shape[0]):
+            if used[j]:
+                continue
+            dx = design[i, 0] - measured[j, 0]
+            dy = design[i, 1] - measured[j, 1]
+            d = dx * dx + dy * dy
+            if d < best:
+                best = d
+                bj = j
+        out[i] = bj
+        best_d2[i] = best
+        if bj >= 0 and np.sqrt(best) <= max_distance:
+            used[bj] = True
+    return out, best_d2
+
+def _nearest_match(design, measured):
+    """为每个设计点位独立寻找最近的实测点位（不排除已匹配的实测点位，可并行）
+    
+    Args:
+        design: 设计点坐标 (N, 2)
+        measured: 实测点坐标 (M, 2)
+        
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: (实测点位索引, 距离平方)
+    """
+    n = design.shape[0]
+    out = np.full(n, -1, np.int64)
+    best_d2 = np.full(n, np.inf)
+    for i in prange(n):
+        best = np.inf
+        bj = -1
+        for j in range(measured.shape[0]):
+            dx = design[i, 0] - measured[j, 0]
+            dy = design[i, 1] - measured[j, 1]
+            d = dx * dx + dy * dy
+            if d < best:
+                best = d
+                bj = j
+        out[i] = bj
+        best_d2[i] = best
+    return out, best_d2
+
+if NUMBA_AVAILABLE:
+    greedy_match = njit(cache=True)(_greedy_match)
+    nearest_match = njit(parallel=True, cache=True)(_nearest_match)
+else:
+    greedy_match = None
+    nearest_match = None
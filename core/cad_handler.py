@@ -3,25 +3,56 @@ CAD处理模块
 """
 import os
 import time
+import pythoncom
+import pywintypes
 import win32com.client
-import win32gui
-import win32con
-import ctypes
-from typing import List, Tuple, Optional, Dict, Any
+import copy
+import numpy as np
+from collections import OrderedDict
+from typing import List, Tuple, Optional, Dict, Any, Union
 from utils.logger import get_logger
+from utils.com_utils import get_autocad_application, cast_entity
 from functools import wraps
 
 # 创建模块的logger
 logger = get_logger(__name__)
 
-def ensure_com_initialized(func):
-    """确保COM环境已初始化的装饰器"""
-    @wraps(func)
-    def wrapper(self, *args, **kwargs):
-        if not self.ensure_com_initialized():
-            return False, "COM环境初始化失败"
-        return func(self, *args, **kwargs)
-    return wrapper
+# 临时过滤选择集名称
+_TEMP_SELECTION_SET = "pf_tmp"
+# AutoCAD选择模式：选择图纸中的全部实体（acSelectionSetAll）
+_AC_SELECTION_SET_ALL = 5
+# 选择集过滤条件中的通配符，图层名等字符串需转义后才能按字面匹配
+_WILDCARD_CHARS = "#@.*?~[]-,`"
+# 查询结果缓存保留的最近图纸数量
+_QUERY_CACHE_DOCS = 8
+
+def _escape_wildcards(text: str) -> str:
+    """转义选择集过滤字符串中的通配符
+    
+    Args:
+        text: 原始字符串（如图层名称）
+        
+    Returns:
+        str: 转义后的字符串
+    """
+    return "".join("`" + ch if ch in _WILDCARD_CHARS else ch for ch in text)
+
+def _require_com(failure: Any):
+    """确保COM环境已初始化的装饰器
+    
+    已初始化时只检查标志位，未初始化时才调用ensure_com_initialized。
+    
+    Args:
+        failure: 初始化失败时的返回值
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(self, *args, **kwargs):
+            if not self._com_initialized and not self.ensure_com_initialized():
+                return copy.copy(failure)
+            return func(self, *args, **kwargs)
+        return wrapper
+    return decorator
 
 class CADHandler:
     """CAD处理类"""
@@ -34,6 +65,8 @@ class CADHandler:
         self._com_initialized = False
         self._max_retries = 3
         self._retry_delay = 1  # 秒
+        # 图层、实体统计等查询结果缓存 {图纸全名: (保存时间TDUPDATE, {查询键: 结果})}
+        self._query_cache = OrderedDict()
         
     def ensure_com_initialized(self) -> bool:
         """
@@ -45,18 +78,14 @@ class CADHandler:
         if not self._com_initialized:
             for attempt in range(self._max_retries):
                 try:
-                    # 尝试获取已存在的CAD应用程序实例
-                    self.app = win32com.client.GetActiveObject("AutoCAD.Application")
-                except:
-                    try:
-                        # 如果没有运行中的实例，创建新的
-                        self.app = win32com.client.Dispatch("AutoCAD.Application")
-                    except Exception as e:
-                        logger.error(f"CAD COM环境初始化失败 (尝试 {attempt + 1}/{self._max_retries}): {e}")
-                        if attempt < self._max_retries - 1:
-                            time.sleep(self._retry_delay)
-                            continue
-                        return False
+                    # 获取已存在的CAD应用程序实例，没有则创建新的（早绑定）
+                    self.app = get_autocad_application()
+                except Exception as e:
+                    logger.error(f"CAD COM环境初始化失败 (尝试 {attempt + 1}/{self._max_retries}): {e}")
+                    if attempt < self._max_retries - 1:
+                        time.sleep(self._retry_delay)
+                        continue
+                    return False
                 
                 try:
                     self.app.Visible = True
@@ -71,6 +100,111 @@ class CADHandler:
                     return False
         return True
     
+    def invalidate_caches(self):
+        """清空图层、实体统计等查询结果缓存"""
+        self._query_cache.clear()
+        
+    def _cached(self, query_key: Tuple, producer: Any) -> Any:
+        """按图纸缓存查询结果
+        
+        图纸以全名区分。DBMOD为0表示图纸自上次保存后未修改，此时图纸内容由全名和
+        保存时间（TDUPDATE）确定，可以使用缓存；图纸有未保存的修改时无法判断内容是否变化，
+        每次都重新查询且不缓存。重新查询失败时，只返回同一图纸上一次的查询结果。
+        
+        Args:
+            query_key: 查询键，如("layers",)
+            producer: 无参数的查询函数
+            
+        Returns:
+            Any: 查询结果的副本
+        """
+        try:
+            doc_key = self.doc.FullName or self.doc.Name
+        except Exception as e:
+            # 无法确定当前图纸时不使用缓存
+            logger.warning(f"读取图纸名称失败，重新查询: {e}")
+            return producer()
+            
+        entry = self._query_cache.get(doc_key)
+        try:
+            stamp = self.doc.GetVariable("TDUPDATE") if self.doc.GetVariable("DBMOD") == 0 else None
+        except Exception as e:
+            logger.warning(f"读取图纸状态失败，重新查询: {e}")
+            stamp = None
+            
+        if stamp is not None and entry is not None and entry[0] == stamp and query_key in entry[1]:
+            self._query_cache.move_to_end(doc_key)
+            return copy.deepcopy(entry[1][query_key])
+            
+        try:
+            value = producer()
+        except Exception as e:
+            if entry is not None and query_key in entry[1]:
+                logger.warning(f"查询失败，使用该图纸的缓存结果: {e}")
+                return copy.deepcopy(entry[1][query_key])
+            raise
+            
+        # 图纸有未保存的修改时不缓存
+        if stamp is None:
+            return value
+            
+        if entry is None or entry[0] != stamp:
+            entry = (stamp, {})
+            self._query_cache[doc_key] = entry
+        entry[1][query_key] = value
+        self._query_cache.move_to_end(doc_key)
+        while len(self._query_cache) > _QUERY_CACHE_DOCS:
+            self._query_cache.popitem(last=False)
+        return copy.deepcopy(value)
+        
+    def _make_filtered_selection(self, dxf_filters: List[Tuple[int, Any]]) -> Any:
+        """创建按DXF组码过滤的临时选择集
+        
+        过滤在AutoCAD进程内完成，只有符合条件的实体会返回给Python。
+        
+        Args:
+            dxf_filters: (DXF组码, 过滤值)列表，如[(0, "CIRCLE"), (8, "图层名")]
+            
+        Returns:
+            Any: 已选中实体的选择集对象，使用后需调用Delete()
+        """
+        selection_sets = self.doc.SelectionSets
+        try:
+            # 删除上次遗留的同名选择集
+            selection_sets.Item(_TEMP_SELECTION_SET).Delete()
+        except Exception:
+            pass
+        selection = selection_sets.Add(_TEMP_SELECTION_SET)
+        
+        # 仅选择模型空间中的实体
+        dxf_filters = list(dxf_filters) + [(410, "Model")]
+        filter_type = win32com.client.VARIANT(
+            pythoncom.VT_ARRAY | pythoncom.VT_I2, [code for code, _ in dxf_filters]
+        )
+        filter_data = win32com.client.VARIANT(
+            pythoncom.VT_ARRAY | pythoncom.VT_VARIANT, [value for _, value in dxf_filters]
+        )
+        # 全选模式下角点参数不起作用，但COM接口要求传入
+        origin = win32com.client.VARIANT(pythoncom.VT_ARRAY | pythoncom.VT_R8, (0.0, 0.0, 0.0))
+        selection.Select(_AC_SELECTION_SET_ALL, origin, origin, filter_type, filter_data)
+        return selection
+        
+    def _select_entities(self, dxf_filters: List[Tuple[int, Any]]) -> List[Any]:
+        """按DXF组码过滤选择实体，并在返回前删除临时选择集
+        
+        Args:
+            dxf_filters: (DXF组码, 过滤值)列表
+            
+        Returns:
+            List[Any]: 符合条件的实体列表
+        """
+        selection = self._make_filtered_selection(dxf_filters)
+        try:
+            return list(selection)
+        finally:
+            selection.Delete()
+    
+    @_require_com((False, "COM环境初始化失败"))
     def open_drawing(self, file_path: str) -> Tuple[bool, str]:
         """打开CAD文件
         
@@ -80,9 +214,6 @@ class CADHandler:
         Returns:
             Tuple[bool, str]: (是否成功, 错误信息)
         """
-        if not self.ensure_com_initialized():
-            return False, "COM环境初始化失败"
-            
         for attempt in range(self._max_retries):
             try:
                 if not os.path.exists(file_path):
@@ -98,6 +229,7 @@ class CADHandler:
                 # 打开指定的文件
                 self.doc = self.app.Documents.Open(file_path)
                 self.modelspace = self.doc.ModelSpace
+                self.invalidate_caches()
                 logger.info(f"成功打开CAD图纸: {file_path}")
                 return True, "打开成功"
             except Exception as e:
@@ -108,27 +240,23 @@ class CADHandler:
                     continue
                 return False, error_msg
     
+    @_require_com([])
     def get_layer_names(self) -> List[str]:
         """获取图层名称列表
         
         Returns:
             List[str]: 图层名称列表
         """
-        if not self.ensure_com_initialized():
-            return []
-            
         try:
             if not self.doc:
                 return []
                 
-            layers = []
-            for layer in self.doc.Layers:
-                layers.append(layer.Name)
-            return layers
+            return self._cached(("layers",), lambda: [layer.Name for layer in self.doc.Layers])
         except Exception as e:
             logger.error(f"获取图层列表失败: {e}")
             return []
     
+    @_require_com([])
     def select_circles(self, layer_name: str) -> List[object]:
         """选择指定图层中的圆
         
@@ -138,22 +266,20 @@ class CADHandler:
         Returns:
             List[object]: 圆对象列表
         """
-        if not self.ensure_com_initialized():
-            return []
-            
         try:
-            if not self.modelspace:
+            if not self.doc:
                 return []
                 
-            circles = []
-            for entity in self.modelspace:
-                if entity.Layer == layer_name and entity.ObjectName == "AcDbCircle":
-                    circles.append(entity)
-            return circles
+            # 由AutoCAD按类型和图层过滤，避免逐个读取实体属性
+            return self._select_entities([
+                (0, "CIRCLE"),
+                (8, _escape_wildcards(layer_name))
+            ])
         except Exception as e:
             logger.error(f"选择圆失败: {e}")
             return []
     
+    @_require_com([])
     def select_points(self, layer_name: Optional[str] = None) -> List[Any]:
         """
         选择指定图层中的点实体
@@ -164,46 +290,67 @@ class CADHandler:
         Returns:
             List[Any]: 选中的点实体列表
         """
-        if not self.ensure_com_initialized():
-            return []
-            
         try:
             if not self.doc:
                 return []
                 
-            points = []
-            for entity in self.doc.ModelSpace:
-                if hasattr(entity, 'ObjectName') and 'Point' in entity.ObjectName:
-                    if layer_name is None or entity.Layer == layer_name:
-                        points.append(entity)
-            return points
+            dxf_filters = [(0, "POINT")]
+            if layer_name is not None:
+                dxf_filters.append((8, _escape_wildcards(layer_name)))
+            return self._select_entities(dxf_filters)
         except Exception as e:
             logger.error(f"选择点实体失败: {e}")
             return []
     
-    def extract_points_from_circles(self, circles: List[object]) -> List[Tuple[float, float]]:
+    def extract_points_from_circles(self, circles: List[object], *,
+                                    as_array: bool = False) -> Union[List[Tuple[float, float]], np.ndarray]:
         """从圆中提取中心点坐标
         
         Args:
             circles: 圆对象列表
+            as_array: 是否直接返回(N, 2)的float64数组，省去转换为元组列表
             
         Returns:
-            List[Tuple[float, float]]: 中心点坐标列表
+            Union[List[Tuple[float, float]], np.ndarray]: 中心点坐标列表或数组，失败时为空
         """
-        if not self.ensure_com_initialized():
-            return []
-            
+        # 在函数内检查COM环境，使初始化失败时的返回值与as_array一致
+        if not self._com_initialized and not self.ensure_com_initialized():
+            return np.empty((0, 2)) if as_array else []
         try:
-            points = []
-            for circle in circles:
-                center = circle.Center
-                points.append((center[0], center[1]))
-            #print(points)
-            return points
+            # 预分配坐标数组，每个圆只读取一次Center属性
+            centers = np.empty((len(circles), 2), dtype=np.float64)
+            for i, circle in enumerate(circles):
+                centers[i] = cast_entity(circle, "IAcadCircle").Center[:2]
+            if as_array:
+                return centers
+            return list(zip(centers[:, 0].tolist(), centers[:, 1].tolist()))
         except Exception as e:
             logger.error(f"提取圆心坐标失败: {e}")
-            return []
+            return np.empty((0, 2)) if as_array else []
     
+    def extract_circle_geometry(self, circles: List[object]) -> np.ndarray:
+        """一次遍历读取圆心坐标和直径
+        
+        每个圆只转换一次接口，圆心和半径在同一次遍历中读取，
+        调用方无需再为统计直径单独遍历一遍圆。
+        
+        Args:
+            circles: 圆对象列表
+            
+        Returns:
+            np.ndarray: (N, 3)数组，每行为(圆心x, 圆心y, 直径)，失败时为空数组
+        """
+        try:
+            geometry = np.empty((len(circles), 3), dtype=np.float64)
+            for i, circle in enumerate(circles):
+                circle = cast_entity(circle, "IAcadCircle")
+                geometry[i, :2] = circle.Center[:2]
+                geometry[i, 2] = circle.Radius * 2
+            return geometry
+        except Exception as e:
+            logger.error(f"读取圆几何信息失败: {e}")
+            return np.empty((0, 3))
+            
     def extract_points_from_points(self, points: List[Any]) -> List[Tuple[float, float, float]]:
         """
         从点实体中提取坐标
@@ -229,6 +376,7 @@ class CADHandler:
         #     logger.error(f"提取点坐标失败: {e}")
         #     return []
     
+    @_require_com(False)
     def highlight_entities(self, entities: List[Any], highlight: bool = True, color: int = 1) -> bool:
         """
         高亮显示实体
@@ -241,21 +389,18 @@ class CADHandler:
         Returns:
             bool: 是否成功
         """
-        if not self.ensure_com_initialized():
-            return False
-            
         try:
             if not self.doc:
                 return False
                 
             for entity in entities:
-                if hasattr(entity, 'Color'):
-                    entity.Color = color if highlight else 0
+                entity.Color = color if highlight else 0
             return True
-        except Exception as e:
+        except pywintypes.com_error as e:
             logger.error(f"高亮显示实体失败: {e}")
             return False
     
+    @_require_com({})
     def analyze_layer_entities(self, layer_name: str) -> Dict[str, int]:
         """
         分析指定图层中的实体类型和数量
@@ -266,19 +411,18 @@ class CADHandler:
         Returns:
             Dict[str, int]: 实体类型和数量的字典
         """
-        if not self.ensure_com_initialized():
-            return {}
-            
         try:
             if not self.doc:
                 return {}
                 
-            entity_counts = {}
-            for entity in self.doc.ModelSpace:
-                if entity.Layer == layer_name:
-                    entity_type = getattr(entity, 'ObjectName', 'Unknown')
+            def count_entities():
+                entity_counts = {}
+                for entity in self._select_entities([(8, _escape_wildcards(layer_name))]):
+                    entity_type = entity.ObjectName
                     entity_counts[entity_type] = entity_counts.get(entity_type, 0) + 1
-            return entity_counts
+                return entity_counts
+                
+            return self._cached(("layer_entities", layer_name), count_entities)
         except Exception as e:
             logger.error(f"分析图层实体失败: {e}")
             return {}
@@ -297,29 +441,32 @@ class CADHandler:
             if not self.doc:
                 return {}
                 
-            circles = self.select_circles(layer_name)
-            if not circles:
-                return {}
+            def collect_stats():
+                circles = self.select_circles(layer_name)
+                if not circles:
+                    return {}
+                    
+                stats = {
+                    'count': len(circles),
+                    'radii': [],
+                    'layers': set()
+                }
                 
-            stats = {
-                'count': len(circles),
-                'radii': [],
-                'layers': set()
-            }
-            
-            for circle in circles:
-                if hasattr(circle, 'Radius'):
+                # 过滤选择集只返回圆，无需逐个探测属性
+                for circle in circles:
+                    circle = cast_entity(circle, "IAcadCircle")
                     stats['radii'].append(circle.Radius)
-                if hasattr(circle, 'Layer'):
                     stats['layers'].add(circle.Layer)
+                        
+                stats['layers'] = list(stats['layers'])
+                if stats['radii']:
+                    stats['avg_radius'] = sum(stats['radii']) / len(stats['radii'])
+                    stats['min_radius'] = min(stats['radii'])
+                    stats['max_radius'] = max(stats['radii'])
                     
-            stats['layers'] = list(stats['layers'])
-            if stats['radii']:
-                stats['avg_radius'] = sum(stats['radii']) / len(stats['radii'])
-                stats['min_radius'] = min(stats['radii'])
-                stats['max_radius'] = max(stats['radii'])
+                return stats
                 
-            return stats
+            return self._cached(("circles", layer_name), collect_stats)
         except Exception as e:
             logger.error(f"分析圆形实体失败: {e}")
             return {}
@@ -368,18 +515,22 @@ class CADHandler:
             bool: 是否成功
         """
         try:
-            with open(file_path, 'w', encoding='utf-8') as f:
-                for i, (x, y) in enumerate(points, 1):
-                    # CASS格式：点号,编码,Y坐标,X坐标,高程
-                    # 编码使用"J"表示桩基点
-                    # 高程默认为0
-                    f.write(f"{i},J,{x:.3f},{y:.3f},0.000\n")
+            rows = np.empty((0, 3))
+            if len(points) > 0:
+                coords = np.asarray(points, dtype=np.float64).reshape(len(points), -1)[:, :2]
+                numbers = np.arange(1, len(coords) + 1, dtype=np.float64)
+                rows = np.column_stack([numbers, coords])
+            # CASS格式：点号,编码,Y坐标,X坐标,高程
+            # 编码使用"J"表示桩基点
+            # 高程默认为0
+            np.savetxt(file_path, rows, fmt='%d,J,%.3f,%.3f,0.000', encoding='utf-8')
             logger.info(f"成功导出CASS格式文件：{file_path}")
             return True
         except Exception as e:
             logger.error(f"导出CASS格式失败: {e}")
             return False
     
+    @_require_com([])
     def get_selected_entities(self) -> List[Any]:
         """
         获取用户当前选中的实体
@@ -387,9 +538,6 @@ class CADHandler:
         Returns:
             List[Any]: 选中的实体列表
         """
-        if not self.ensure_com_initialized():
-            return []
-            
         try:
             if not self.doc:
                 return []
@@ -415,6 +563,7 @@ class CADHandler:
             logger.error(f"获取选中实体失败: {e}")
             return []
             
+    @_require_com([])
     def find_similar_circles(self, reference_circle: Any, tolerance: float = 0.1) -> List[Any]:
         """
         查找与参考圆相似的圆形
@@ -426,14 +575,12 @@ class CADHandler:
         Returns:
             List[Any]: 相似圆形列表
         """
-        if not self.ensure_com_initialized():
-            return []
-            
         try:
-            if not self.modelspace:
+            if not self.doc:
                 return []
                 
             # 获取参考圆的属性
+            reference_circle = cast_entity(reference_circle, "IAcadCircle")
             ref_radius = reference_circle.Radius
             ref_layer = reference_circle.Layer
             
@@ -441,15 +588,13 @@ class CADHandler:
             min_radius = ref_radius * (1 - tolerance)
             max_radius = ref_radius * (1 + tolerance)
             
-            # 查找相似圆
-            similar_circles = []
-            for entity in self.modelspace:
-                if (entity.ObjectName == "AcDbCircle" and 
-                    entity.Layer == ref_layer and
-                    min_radius <= entity.Radius <= max_radius):
-                    similar_circles.append(entity)
-                    
-            return similar_circles
+            # 查找相似圆（半径范围通过-4关系运算符交给AutoCAD过滤）
+            return self._select_entities([
+                (0, "CIRCLE"),
+                (8, _escape_wildcards(ref_layer)),
+                (-4, ">="), (40, min_radius),
+                (-4, "<="), (40, max_radius)
+            ])
         except Exception as e:
             logger.error(f"查找相似圆失败: {e}")
             return [] 
\ No newline at end of file
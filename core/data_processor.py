@@ -2,28 +2,158 @@
 数据处理模块
 """
 import os
-import pandas as pd
+import logging
+import importlib.util
 import numpy as np
-from typing import List, Dict, Any, Tuple, Optional
+from typing import List, Dict, Any, Tuple, Optional, TYPE_CHECKING
 from utils.logger import get_logger
 
+if TYPE_CHECKING:
+    import pandas as pd
+
+# pandas、scipy、numba导入较慢，只检查是否安装，在用到时再导入以加快程序启动
+NUMBA_AVAILABLE = importlib.util.find_spec('numba') is not None
+SCIPY_AVAILABLE = importlib.util.find_spec('scipy') is not None
+
 # 创建模块的logger
 logger = get_logger(__name__)
 
+# 按距离匹配时单块距离矩阵的最大元素数（约32MB），避免点数较多时一次性分配N×M矩阵
+_DISTANCE_BLOCK_ELEMENTS = 4_000_000
+
+# 导出Excel使用的引擎，安装了xlsxwriter时优先使用（写入数值数据更快），否则由pandas自动选择
+_EXCEL_ENGINE = 'xlsxwriter' if importlib.util.find_spec('xlsxwriter') else None
+
+# 分块读取CASS数据时每块的行数
+_CASS_CHUNK_ROWS = 65536
+
+# CASS数据列类型，坐标和高程直接按浮点数解析，避免逐列推断类型
+# 点号可能包含字母，仍由pandas推断
+_CASS_DTYPES = {'y': np.float64, 'x': np.float64, 'elevation': np.float64}
+
+# CASS格式各列：点号,编码,Y坐标,X坐标,高程（高程列可能缺失）
+_CASS_NAMES = ['point_number', 'code', 'y', 'x', 'elevation']
+
+def _cass_column_names(file_path: str) -> List[str]:
+    """按首个非空行的字段数确定CASS文件的列名
+    
+    指定的列名多于文件的列数时C解析器会报错，没有高程列的4列文件只使用前4个列名。
+    
+    Args:
+        file_path: 数据文件路径
+        
+    Returns:
+        List[str]: 列名列表
+    """
+    with open(file_path, 'rb') as f:
+        for line in f:
+            if line.strip():
+                return _CASS_NAMES if line.count(b',') >= 4 else _CASS_NAMES[:4]
+    return _CASS_NAMES
+
+def _as_xy(points: Any) -> np.ndarray:
+    """将点位序列转换为(N, 2)的float64数组
+    
+    Args:
+        points: 点位序列，如[(x, y), ...]或(N, 2)数组，多余的坐标分量会被忽略
+        
+    Returns:
+        np.ndarray: 点位坐标数组
+    """
+    arr = np.asarray(points, dtype=np.float64)
+    if arr.size == 0:
+        return np.empty((0, 2))
+    return np.ascontiguousarray(arr.reshape(len(arr), -1)[:, :2])
+
 class DataProcessor:
     """数据处理类"""
     
     def __init__(self):
         """初始化数据处理器"""
-        self.design_points = []  # [(x, y), ...]
-        self.design_point_numbers = []  # [point_number, ...]
-        self.measured_points = []  # [(x, y), ...]
-        self.measured_point_numbers = []  # [point_number, ...]
-        self.measured_elevations = []  # [elevation, ...]  # 新增存储实测高程
-        self.matched_points = []  # [(design_point, measured_point), ...]
-        self.matched_elevations = []  # [elevation, ...]  # 新增存储匹配点的高程
+        # 点位数据按列（SoA）存储为NumPy数组
+        self.design_xy = np.empty((0, 2))  # 设计点坐标 (N, 2)
+        self.design_pn = np.empty(0, dtype=object)  # 设计点号 (N,)
+        self.measured_xy = np.empty((0, 2))  # 实测点坐标 (M, 2)
+        self.measured_pn = np.empty(0, dtype=object)  # 实测点号 (M,)
+        self.measured_z = np.empty(0)  # 实测高程 (M,)
+        self.matched_design_xy = np.empty((0, 2))  # 匹配后的设计点坐标 (K, 2)
+        self.matched_measured_xy = np.empty((0, 2))  # 匹配后的实测点坐标 (K, 2)
+        self.matched_z = np.empty(0)  # 匹配点的高程 (K,)
         self.deviations = []  # 偏差值列表
+        self._dev_stats = None  # (最小值, 平均值, 最大值)，由calculate_deviations计算
         self.arrow_scale = 0.5  # 默认箭头比例
+        self._frame_cache = {}  # {is_design: (数据来源, 以点号为索引的DataFrame)}
+        
+    # 以下属性以列表形式读写点位数据，兼容按列表使用的旧接口
+    
+    @property
+    def design_points(self) -> List[Tuple[float, float]]:
+        """设计点位列表 [(x, y), ...]"""
+        return list(zip(self.design_xy[:, 0].tolist(), self.design_xy[:, 1].tolist()))
+        
+    @design_points.setter
+    def design_points(self, points: Any):
+        self.design_xy = _as_xy(points)
+        
+    @property
+    def design_point_numbers(self) -> List[Any]:
+        """设计点号列表"""
+        return self.design_pn.tolist()
+        
+    @design_point_numbers.setter
+    def design_point_numbers(self, numbers: Any):
+        self.design_pn = np.asarray(list(numbers))
+        
+    @property
+    def measured_points(self) -> List[Tuple[float, float]]:
+        """实测点位列表 [(x, y), ...]"""
+        return list(zip(self.measured_xy[:, 0].tolist(), self.measured_xy[:, 1].tolist()))
+        
+    @measured_points.setter
+    def measured_points(self, points: Any):
+        self.measured_xy = _as_xy(points)
+        
+    @property
+    def measured_point_numbers(self) -> List[Any]:
+        """实测点号列表"""
+        return self.measured_pn.tolist()
+        
+    @measured_point_numbers.setter
+    def measured_point_numbers(self, numbers: Any):
+        self.measured_pn = np.asarray(list(numbers))
+        
+    @property
+    def measured_elevations(self) -> List[float]:
+        """实测高程列表"""
+        return self.measured_z.tolist()
+        
+    @measured_elevations.setter
+    def measured_elevations(self, elevations: Any):
+        self.measured_z = np.asarray(elevations, dtype=np.float64)
+        
+    @property
+    def matched_points(self) -> List[Tuple[Tuple[float, float], Tuple[float, float]]]:
+        """匹配后的点位列表 [(design_point, measured_point), ...]"""
+        design_arr, measured_arr = self._pairs_as_arrays()
+        return list(zip(
+            zip(design_arr[:, 0].tolist(), design_arr[:, 1].tolist()),
+            zip(measured_arr[:, 0].tolist(), measured_arr[:, 1].tolist())
+        ))
+        
+    @matched_points.setter
+    def matched_points(self, pairs: Any):
+        pairs = list(pairs)
+        self.matched_design_xy = _as_xy([design_point for design_point, _ in pairs])
+        self.matched_measured_xy = _as_xy([measured_point for _, measured_point in pairs])
+        
+    @property
+    def matched_elevations(self) -> List[float]:
+        """匹配点的高程列表"""
+        return self.matched_z.tolist()
+        
+    @matched_elevations.setter
+    def matched_elevations(self, elevations: Any):
+        self.matched_z = np.asarray(elevations, dtype=np.float64)
         
     def load_cass_data(self, file_path: str, is_design: bool = False) -> Tuple[bool, str]:
         """加载Cass格式数据
@@ -35,30 +165,58 @@ class DataProcessor:
         Returns:
             Tuple[bool, str]: (是否成功, 错误信息)
         """
+        import pandas as pd
+        
         try:
             # CASS格式：点号,编码,Y坐标,X坐标,高程
-            df = pd.read_csv(file_path, header=None, names=['point_number', 'code', 'y', 'x', 'elevation'])
-            
+            # 编码列不参与计算，不解析；设计数据同样不需要高程列
+            names = _cass_column_names(file_path)
+            has_elevation = not is_design and 'elevation' in names
+            usecols = ['point_number', 'y', 'x', 'elevation'] if has_elevation else ['point_number', 'y', 'x']
+            reader = pd.read_csv(
+                file_path,
+                header=None,
+                names=names,
+                usecols=usecols,
+                dtype=_CASS_DTYPES,
+                engine='c',
+                chunksize=_CASS_CHUNK_ROWS
+            )
+            
+            # 分块读取，每块只保留需要的列，避免整个数据框常驻内存
+            point_number_chunks, xy_chunks, elevation_chunks = [], [], []
+            with reader:
+                for chunk in reader:
+                    point_number_chunks.append(chunk['point_number'].to_numpy())
+                    if is_design:
+                        # 设计数据不需要交换XY，直接使用CASS格式的坐标
+                        xy_chunks.append(chunk[['y', 'x']].to_numpy(dtype=np.float64))  # Y作为X，X作为Y
+                    else:
+                        # 实测数据需要交换XY
+                        xy_chunks.append(chunk[['x', 'y']].to_numpy(dtype=np.float64))  # X作为Y，Y作为X
+                        if has_elevation:
+                            elevation_chunks.append(chunk['elevation'].to_numpy(copy=False))
+                        else:
+                            # 文件没有高程列时高程为NaN
+                            elevation_chunks.append(np.full(len(chunk), np.nan))
+                        
+            points = np.concatenate(xy_chunks)
+            point_numbers = np.concatenate(point_number_chunks)
             if is_design:
-                # 设计数据不需要交换XY，直接使用CASS格式的坐标
-                points = list(zip(df['y'], df['x']))  # Y作为X，X作为Y
                 logger.info("加载设计数据：保持CASS格式坐标")
             else:
-                # 实测数据需要交换XY
-                points = list(zip(df['x'], df['y']))  # X作为Y，Y作为X
                 # 加载高程数据
-                elevations = df['elevation'].tolist()
+                elevations = np.concatenate(elevation_chunks)
                 logger.info("加载实测数据：交换XY坐标并加载高程")
-            
-            point_numbers = df['point_number'].tolist()
+                
             
             if is_design:
-                self.design_points = points
-                self.design_point_numbers = point_numbers
+                self.design_xy = points
+                self.design_pn = point_numbers
             else:
-                self.measured_points = points
-                self.measured_point_numbers = point_numbers
-                self.measured_elevations = elevations  # 存储高程数据
+                self.measured_xy = points
+                self.measured_pn = point_numbers
+                self.measured_z = elevations  # 存储高程数据
             
             logger.info(f"成功加载CASS数据，共{len(points)}个点")
             if len(points) > 0:
@@ -83,10 +241,12 @@ class DataProcessor:
         Returns:
             Tuple[bool, str]: (是否成功, 错误信息)
         """
+        import pandas as pd
+        
         try:
             columns = [col.strip() for col in column_format.split(',')]
             df = pd.read_csv(file_path, usecols=columns)
-            self.measured_points = list(zip(df[columns[0]], df[columns[1]]))
+            self.measured_xy = df[columns[:2]].to_numpy(dtype=np.float64)
             return True, ""
         except Exception as e:
             logger.error(f"加载自定义格式数据失败: {e}")
@@ -107,41 +267,89 @@ class DataProcessor:
             bool: 是否成功
         """
         try:
-            if not self.design_points or not self.measured_points:
-                logger.error("设计点位或实测点位数据为空")
-                return False
-                
-            # 创建点号到坐标的映射
-            design_dict = dict(zip(self.design_point_numbers, self.design_points))
-            measured_dict = dict(zip(self.measured_point_numbers, self.measured_points))
-            # 创建点号到高程的映射
-            elevation_dict = dict(zip(self.measured_point_numbers, self.measured_elevations))
-            
-            # 找到共同的点号
-            common_numbers = set(self.design_point_numbers) & set(self.measured_point_numbers)
-            
-            if not common_numbers:
-                logger.error("未找到匹配的点号")
-                return False
-                
-            # 按点号匹配点位
-            self.matched_points = [
-                (design_dict[num], measured_dict[num])
-                for num in common_numbers
-            ]
-            
-            # 匹配高程
-            self.matched_elevations = [
-                elevation_dict[num]
-                for num in common_numbers
-            ]
-            
-            logger.info(f"按点号匹配成功，共匹配{len(self.matched_points)}个点")
-            return True
+            return self._apply_match(self._pairs_by_point_number(), "按点号")
         except Exception as e:
             logger.error(f"按点号匹配点位失败: {e}")
             return False
             
+    def _pairs_by_point_number(self) -> Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """按点号计算匹配点对，不修改匹配结果
+        
+        Returns:
+            Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]]: (设计点坐标, 实测点坐标, 高程)，失败返回None
+        """
+        if len(self.design_xy) == 0 or len(self.measured_xy) == 0:
+            logger.error("设计点位或实测点位数据为空")
+            return None
+            
+        # 以点号为索引连接设计点位和实测点位（保持设计点位顺序）
+        joined = self._point_frame(is_design=True).join(
+            self._point_frame(is_design=False), how='inner', lsuffix='_d', rsuffix='_m'
+        )
+        
+        if joined.empty:
+            logger.error("未找到匹配的点号")
+            return None
+            
+        # 按点号匹配点位，并匹配高程
+        return (
+            joined[['x_d', 'y_d']].to_numpy(dtype=np.float64),
+            joined[['x_m', 'y_m']].to_numpy(dtype=np.float64),
+            joined['elevation'].to_numpy(dtype=np.float64)
+        )
+        
+    def _apply_match(self, pairs: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]], method: str) -> bool:
+        """保存匹配结果
+        
+        Args:
+            pairs: (设计点坐标, 实测点坐标, 高程)，None表示匹配失败
+            method: 匹配方式名称，用于日志
+            
+        Returns:
+            bool: 是否成功
+        """
+        if pairs is None:
+            return False
+        self.matched_design_xy, self.matched_measured_xy, self.matched_z = pairs
+        logger.info(f"{method}匹配成功，共匹配{len(self.matched_design_xy)}个点")
+        return True
+        
+    def _point_frame(self, is_design: bool) -> "pd.DataFrame":
+        """获取以点号为索引的点位数据框
+        
+        数据框按点位数组对象缓存，重新加载或替换点位数据后自动重建。
+        点号重复时保留最后一个点位。
+        
+        Args:
+            is_design: 是否为设计点位
+            
+        Returns:
+            pd.DataFrame: 包含x、y列（实测点位另含elevation列）的数据框
+        """
+        import pandas as pd
+        
+        if is_design:
+            source = (self.design_pn, self.design_xy)
+        else:
+            source = (self.measured_pn, self.measured_xy, self.measured_z)
+            
+        cached = self._frame_cache.get(is_design)
+        if cached is not None and all(a is b for a, b in zip(cached[0], source)):
+            return cached[1]
+            
+        count = min(len(values) for values in source)
+        coords = source[1][:count]
+        frame = pd.DataFrame(
+            {'x': coords[:, 0], 'y': coords[:, 1]},
+            index=pd.Index(source[0][:count], name='point_number')
+        )
+        if not is_design:
+            frame['elevation'] = source[2][:count]
+        frame = frame[~frame.index.duplicated(keep='last')]
+        
+        self._frame_cache[is_design] = (source, frame)
+        return frame
+        
     def match_by_sequence(self) -> bool:
         """按顺序匹配点位
         
@@ -149,100 +357,227 @@ class DataProcessor:
             bool: 是否成功
         """
         try:
-            if not self.design_points or not self.measured_points:
-                logger.error("设计点位或实测点位数据为空")
-                return False
-                
-            if len(self.design_points) != len(self.measured_points):
-                logger.error("设计点位和实测点位数量不一致")
-                return False
-                
-            # 直接按顺序匹配
-            self.matched_points = list(zip(self.design_points, self.measured_points))
-            # 高程直接使用实测高程
-            self.matched_elevations = self.measured_elevations.copy()
-            
-            logger.info(f"按顺序匹配成功，共匹配{len(self.matched_points)}个点")
-            return True
+            return self._apply_match(self._pairs_by_sequence(), "按顺序")
         except Exception as e:
             logger.error(f"按顺序匹配点位失败: {e}")
             return False
             
-    def match_by_distance(self, max_distance: float) -> bool:
+    def _pairs_by_sequence(self) -> Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """按顺序计算匹配点对，不修改匹配结果
+        
+        Returns:
+            Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]]: (设计点坐标, 实测点坐标, 高程)，失败返回None
+        """
+        if len(self.design_xy) == 0 or len(self.measured_xy) == 0:
+            logger.error("设计点位或实测点位数据为空")
+            return None
+            
+        if len(self.design_xy) != len(self.measured_xy):
+            logger.error("设计点位和实测点位数量不一致")
+            return None
+            
+        # 直接按顺序匹配，高程直接使用实测高程
+        return self.design_xy.copy(), self.measured_xy.copy(), self.measured_z.copy()
+        
+    def match_by_distance(self, max_distance: float, greedy: bool = True, optimal: bool = True) -> bool:
         """按距离匹配点位
         
         Args:
             max_distance: 最大匹配距离
+            greedy: 是否贪心匹配（按设计点位顺序，每个实测点位最多匹配一次）；
+                为False时每个设计点位独立取最近的实测点位，可并行计算
+            optimal: 安装scipy时是否使用最优分配（匹配数最多且距离平方和最小），
+                未安装scipy时按greedy参数匹配
             
         Returns:
             bool: 是否成功
         """
         try:
-            if not self.design_points or not self.measured_points:
-                logger.error("设计点位或实测点位数据为空")
-                return False
-                
-            matched = []
-            matched_elevs = []  # 存储对应的高程值
-            used_measured = set()
-            
-            # 对每个设计点位
-            for i, design_point in enumerate(self.design_points):
-                min_dist = float('inf')
-                best_match = None
-                best_index = None
-                
-                # 寻找最近的实测点位
-                for j, measured_point in enumerate(self.measured_points):
-                    if j in used_measured:
-                        continue
-                        
-                    dist = np.sqrt(
-                        (design_point[0] - measured_point[0])**2 + 
-                        (design_point[1] - measured_point[1])**2
-                    )
-                    
-                    if dist < min_dist and dist <= max_distance:
-                        min_dist = dist
-                        best_match = measured_point
-                        best_index = j
-                        
-                if best_match is not None:
-                    matched.append((design_point, best_match))
-                    matched_elevs.append(self.measured_elevations[best_index])  # 添加对应的高程
-                    used_measured.add(best_index)
-                    logger.debug(f"点位{i+1}匹配成功，距离={min_dist:.2f}")
-                else:
-                    logger.warning(f"点位{i+1}未找到匹配点")
-                    
-            self.matched_points = matched
-            self.matched_elevations = matched_elevs
-            
-            if matched:
-                logger.info(f"按距离匹配成功，共匹配{len(matched)}个点")
-                return True
-            else:
-                logger.error("未找到任何匹配点")
-                return False
+            return self._apply_match(self._pairs_by_distance(max_distance, greedy, optimal), "按距离")
         except Exception as e:
             logger.error(f"按距离匹配点位失败: {e}")
             return False
             
-    def get_matched_points(self) -> List[Tuple[Tuple[float, float], Tuple[float, float]]]:
-        """获取匹配后的点位列表
+    def _pairs_by_distance(self, max_distance: float, greedy: bool = True,
+                           optimal: bool = True) -> Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """按距离计算匹配点对，不修改匹配结果
         
+        Args:
+            max_distance: 最大匹配距离
+            greedy: 是否贪心匹配
+            optimal: 是否使用最优分配
+            
         Returns:
-            List[Tuple[Tuple[float, float], Tuple[float, float]]]: 匹配后的点位列表
+            Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]]: (设计点坐标, 实测点坐标, 高程)，失败返回None
         """
-        return self.matched_points
+        if len(self.design_xy) == 0 or len(self.measured_xy) == 0:
+            logger.error("设计点位或实测点位数据为空")
+            return None
+            
+        design_arr = self.design_xy
+        measured_arr = self.measured_xy
+        if optimal and SCIPY_AVAILABLE:
+            nearest, min_dists = self._optimal_assignment(design_arr, measured_arr, max_distance)
+        else:
+            nearest, min_dists = self._nearest_measured(design_arr, measured_arr, max_distance, greedy)
+            
+        matched = (nearest >= 0) & (min_dists <= max_distance)
+        design_indices = np.flatnonzero(matched)  # 匹配成功的设计点位索引
+        measured_indices = nearest[design_indices]  # 对应的实测点位索引
         
-    def get_matched_elevations(self) -> List[float]:
-        """获取匹配后的高程列表
+        # 逐点日志使用%格式延迟格式化；DEBUG级别未启用时跳过整个循环
+        if logger.isEnabledFor(logging.DEBUG):
+            for i, min_dist in zip(design_indices.tolist(), min_dists[design_indices].tolist()):
+                logger.debug("点位%d匹配成功，距离=%.2f", i + 1, min_dist)
+        for i in np.flatnonzero(~matched).tolist():
+            logger.warning("点位%d未找到匹配点", i + 1)
+            
+        if len(design_indices) == 0:
+            logger.error("未找到任何匹配点")
+            return None
+            
+        # 添加对应的高程（自定义格式数据没有高程时为空）
+        if len(self.measured_z) == len(measured_arr):
+            elevations = self.measured_z[measured_indices]
+        else:
+            elevations = np.empty(0)
+        return design_arr[design_indices], measured_arr[measured_indices], elevations
+        
+    @staticmethod
+    def _optimal_assignment(design_arr: np.ndarray, measured_arr: np.ndarray,
+                            max_distance: float) -> Tuple[np.ndarray, np.ndarray]:
+        """按最优分配匹配设计点位和实测点位
         
+        只考虑距离不超过max_distance的点对（KD树筛选，代价矩阵为稀疏矩阵），
+        在匹配数最多的前提下使距离平方和最小。每个设计点位另设一个高代价的虚拟实测点位，
+        保证总能得到完整匹配，匹配到虚拟点位即表示未匹配。
+        
+        Args:
+            design_arr: 设计点坐标 (N, 2)
+            measured_arr: 实测点坐标 (M, 2)
+            max_distance: 最大匹配距离
+            
         Returns:
-            List[float]: 匹配后的高程列表
+            Tuple[np.ndarray, np.ndarray]: (实测点位索引, 距离)，未匹配时索引为-1、距离为inf
         """
-        return self.matched_elevations
+        from scipy.spatial import cKDTree
+        from scipy.sparse import csr_matrix
+        from scipy.sparse.csgraph import min_weight_full_bipartite_matching
+        
+        n, m = len(design_arr), len(measured_arr)
+        nearest = np.full(n, -1, dtype=np.int64)
+        min_dists = np.full(n, np.inf)
+        
+        candidates = cKDTree(design_arr).sparse_distance_matrix(
+            cKDTree(measured_arr), max_distance, output_type='ndarray'
+        )
+        if len(candidates) == 0:
+            return nearest, min_dists
+            
+        # 稀疏矩阵中0代价视为无边，代价统一加1保证为正
+        cost = candidates['v'] ** 2 + 1.0
+        # 虚拟点位的代价大于任意一条增广路径上真实代价的总和，保证优先增加匹配数
+        penalty = n * (max_distance ** 2 + 1.0) + 1.0
+        rows = np.concatenate([candidates['i'], np.arange(n)])
+        cols = np.concatenate([candidates['j'], m + np.arange(n)])
+        data = np.concatenate([cost, np.full(n, penalty)])
+        graph = csr_matrix((data, (rows, cols)), shape=(n, m + n))
+        
+        row_ind, col_ind = min_weight_full_bipartite_matching(graph)
+        real = col_ind < m
+        row_ind, col_ind = row_ind[real], col_ind[real]
+        nearest[row_ind] = col_ind
+        min_dists[row_ind] = np.linalg.norm(design_arr[row_ind] - measured_arr[col_ind], axis=1)
+        return nearest, min_dists
+        
+    @staticmethod
+    def _nearest_measured(design_arr: np.ndarray, measured_arr: np.ndarray,
+                          max_distance: float, greedy: bool) -> Tuple[np.ndarray, np.ndarray]:
+        """为每个设计点位寻找最近的实测点位
+        
+        安装numba时使用编译后的内核，否则按块计算距离矩阵。
+        
+        Args:
+            design_arr: 设计点坐标 (N, 2)
+            measured_arr: 实测点坐标 (M, 2)
+            max_distance: 最大匹配距离，贪心匹配时超出距离的实测点位不会被占用
+            greedy: 是否贪心匹配
+            
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: (最近实测点位索引, 距离)，无可用实测点位时索引为-1
+        """
+        if NUMBA_AVAILABLE:
+            from core._match_numba import greedy_match, nearest_match
+            
+            if greedy:
+                nearest, best_d2 = greedy_match(design_arr, measured_arr, max_distance)
+            else:
+                nearest, best_d2 = nearest_match(design_arr, measured_arr)
+            return nearest, np.sqrt(best_d2)
+            
+        nearest = np.full(len(design_arr), -1, dtype=np.int64)
+        min_dists = np.full(len(design_arr), np.inf)
+        used_measured = np.zeros(len(measured_arr), dtype=bool)
+        
+        # 按块计算设计点位到所有实测点位的距离矩阵，控制单块内存占用
+        block_size = max(1, _DISTANCE_BLOCK_ELEMENTS // max(1, len(measured_arr)))
+        for start in range(0, len(design_arr), block_size):
+            block = design_arr[start:start + block_size]
+            diff = block[:, None, :] - measured_arr[None, :, :]
+            # 比较时使用距离平方，只对每行的最小值开方
+            block_d2 = diff[..., 0] ** 2 + diff[..., 1] ** 2
+            
+            if not greedy:
+                best = np.argmin(block_d2, axis=1)
+                nearest[start:start + len(block)] = best
+                min_dists[start:start + len(block)] = np.sqrt(block_d2[np.arange(len(block)), best])
+                continue
+                
+            # 依次为块内每个设计点位寻找最近且未被使用的实测点位（贪心匹配，与设计点位顺序一致）
+            for k, d2 in enumerate(block_d2):
+                i = start + k
+                d2[used_measured] = np.inf
+                best_index = int(np.argmin(d2))
+                min_dist = np.sqrt(d2[best_index])
+                nearest[i] = best_index
+                min_dists[i] = min_dist
+                if min_dist <= max_distance:
+                    used_measured[best_index] = True
+                    
+        return nearest, min_dists
+            
+    def _pairs_as_arrays(self) -> Tuple[np.ndarray, np.ndarray]:
+        """获取匹配点对的设计、实测两个(N, 2)数组
+        
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: (设计点坐标数组, 实测点坐标数组)
+        """
+        return self.matched_design_xy, self.matched_measured_xy
+        
+    def _deviations_mm(self) -> np.ndarray:
+        """计算所有匹配点对的偏差（毫米）
+        
+        Returns:
+            np.ndarray: 偏差值数组
+        """
+        design_arr, measured_arr = self._pairs_as_arrays()
+        return np.linalg.norm(measured_arr - design_arr, axis=1) * 1000.0  # 转换为毫米
+        
+    def get_matched_points(self) -> np.ndarray:
+        """获取匹配后的点位数组
+        
+        Returns:
+            np.ndarray: 形状为(N, 2, 2)的数组，[i, 0]为设计点坐标，[i, 1]为实测点坐标
+        """
+        return np.stack((self.matched_design_xy, self.matched_measured_xy), axis=1)
+        
+    def get_matched_elevations(self) -> np.ndarray:
+        """获取匹配后的高程数组
+        
+        Returns:
+            np.ndarray: 匹配后的高程数组
+        """
+        return self.matched_z
         
     def calculate_statistics(self) -> Optional[Dict]:
         """计算偏差统计信息
@@ -251,26 +586,18 @@ class DataProcessor:
             Optional[Dict]: 统计信息字典
         """
         try:
-            if not self.matched_points:
+            if len(self.matched_design_xy) == 0:
                 return None
                 
-            deviations = []
-            for design_point, measured_point in self.matched_points:
-                deviation = np.sqrt(
-                    (design_point[0] - measured_point[0])**2 + 
-                    (design_point[1] - measured_point[1])**2
-                )
-                deviations.append(deviation * 1000)  # 转换为毫米
-                
-            deviations = np.array(deviations)
+            deviations = self._deviations_mm()
             
             return {
                 'total_points': len(deviations),
-                'max_deviation': np.max(deviations),
-                'min_deviation': np.min(deviations),
-                'mean_deviation': np.mean(deviations),
-                'std_deviation': np.std(deviations),
-                'exceeded_points': np.sum(deviations > 30.0)  # 30mm为限差
+                'max_deviation': deviations.max(),
+                'min_deviation': deviations.min(),
+                'mean_deviation': deviations.mean(),
+                'std_deviation': deviations.std(),
+                'exceeded_points': int((deviations > 30.0).sum())  # 30mm为限差
             }
         except Exception as e:
             logger.error(f"计算偏差统计信息失败: {e}")
@@ -285,30 +612,25 @@ class DataProcessor:
         Returns:
             bool: 是否成功
         """
+        import pandas as pd
+        
         try:
-            if not self.matched_points:
+            if len(self.matched_design_xy) == 0:
                 return False
                 
-            # 创建数据框
-            data = []
-            for i, (design_point, measured_point) in enumerate(self.matched_points, 1):
-                deviation = np.sqrt(
-                    (design_point[0] - measured_point[0])**2 + 
-                    (design_point[1] - measured_point[1])**2
-                )
-                data.append({
-                    '点号': i,
-                    '设计X(m)': design_point[0],
-                    '设计Y(m)': design_point[1],
-                    '实测X(m)': measured_point[0],
-                    '实测Y(m)': measured_point[1],
-                    '偏差(mm)': deviation * 1000  # 转换为毫米
-                })
-                
-            df = pd.DataFrame(data)
+            # 按列创建数据框
+            design_arr, measured_arr = self._pairs_as_arrays()
+            df = pd.DataFrame({
+                '点号': np.arange(1, len(design_arr) + 1),
+                '设计X(m)': design_arr[:, 0],
+                '设计Y(m)': design_arr[:, 1],
+                '实测X(m)': measured_arr[:, 0],
+                '实测Y(m)': measured_arr[:, 1],
+                '偏差(mm)': self._deviations_mm()
+            })
             
             # 导出到Excel
-            df.to_excel(file_path, index=False)
+            df.to_excel(file_path, index=False, engine=_EXCEL_ENGINE)
             return True
         except Exception as e:
             logger.error(f"导出统计数据失败: {e}")
@@ -321,29 +643,24 @@ class DataProcessor:
             bool: 计算是否成功
         """
         try:
-            if not self.matched_points:
+            if len(self.matched_design_xy) == 0:
                 logger.warning("没有匹配的点位数据，无法计算偏差")
                 return False
                 
             # 计算每个点位的偏差
-            self.deviations = []
-            for design_point, measured_point in self.matched_points:
-                dx = measured_point[0] - design_point[0]
-                dy = measured_point[1] - design_point[1]
-                deviation = (dx**2 + dy**2)**0.5 * 1000  # 转换为毫米
-                self.deviations.append(deviation)
-                
-            # 计算统计值
-            max_dev = max(self.deviations)
-            min_dev = min(self.deviations)
-            avg_dev = sum(self.deviations) / len(self.deviations)
+            deviations = self._deviations_mm()
+            self.deviations = deviations.tolist()
+            
+            # 计算统计值，供计算箭头比例时复用
+            min_dev, avg_dev, max_dev = float(deviations.min()), float(deviations.mean()), float(deviations.max())
+            self._dev_stats = (min_dev, avg_dev, max_dev)
             
-            logger.info(f"偏差统计: 最大值={max_dev:.2f}mm, 最小值={min_dev:.2f}mm, 平均值={avg_dev:.2f}mm")
+            logger.info("偏差统计: 最大值=%.2fmm, 最小值=%.2fmm, 平均值=%.2fmm", max_dev, min_dev, avg_dev)
             
             # 计算建议的箭头比例
             self.arrow_scale = self.calculate_arrow_scale(pile_diameter=1000)  # 使用默认桩径
             
-            logger.info(f"计算得到建议的箭头比例: {self.arrow_scale:.3f}")
+            logger.info("计算得到建议的箭头比例: %.3f", self.arrow_scale)
             return True
             
         except Exception as e:
@@ -370,16 +687,17 @@ class DataProcessor:
             return avg_scale
             
         radius = pile_diameter / 2
-        max_dev = max(self.deviations)
-        min_dev = min(self.deviations)
-        avg_dev = sum(self.deviations) / len(self.deviations)
+        if self._dev_stats is None:
+            deviations = np.asarray(self.deviations, dtype=np.float64)
+            self._dev_stats = (float(deviations.min()), float(deviations.mean()), float(deviations.max()))
+        min_dev, avg_dev, max_dev = self._dev_stats
         
-        logger.info(f"计算箭头比例 - 最大偏差: {max_dev:.2f}mm, 最小偏差: {min_dev:.2f}mm, 平均偏差: {avg_dev:.2f}mm")
+        logger.info("计算箭头比例 - 最大偏差: %.2fmm, 最小偏差: %.2fmm, 平均偏差: %.2fmm", max_dev, min_dev, avg_dev)
         
         # 处理特殊情况
         if min_dev == 0:
             min_dev = max_dev * 0.1  # 将最小偏差设为最大偏差的10%
-            logger.info(f"最小偏差为0，调整为最大偏差的10%: {min_dev:.2f}mm")
+            logger.info("最小偏差为0，调整为最大偏差的10%%: %.2fmm", min_dev)
         
         if max_dev == 0:  # 所有偏差都为0的情况
             logger.info("所有偏差都为0，使用默认箭头比例")
@@ -390,14 +708,15 @@ class DataProcessor:
         target_avg_length = radius * avg_scale  # 平均箭头期望长度
         target_max_length = radius * max_scale  # 最大箭头期望长度
         
-        logger.info(f"目标箭头长度 - 最小: {target_min_length:.2f}mm, 平均: {target_avg_length:.2f}mm, 最大: {target_max_length:.2f}mm")
+        logger.info("目标箭头长度 - 最小: %.2fmm, 平均: %.2fmm, 最大: %.2fmm",
+                    target_min_length, target_avg_length, target_max_length)
         
         # 计算比例（箭头长度 = 偏差值 * 比例）
         scale_by_min = target_min_length / min_dev  # 使最小偏差显示为最小目标长度
         scale_by_avg = target_avg_length / avg_dev  # 使平均偏差显示为平均目标长度
         scale_by_max = target_max_length / max_dev  # 使最大偏差显示为最大目标长度
         
-        logger.info(f"候选比例 - 最小: {scale_by_min:.3f}, 平均: {scale_by_avg:.3f}, 最大: {scale_by_max:.3f}")
+        logger.info("候选比例 - 最小: %.3f, 平均: %.3f, 最大: %.3f", scale_by_min, scale_by_avg, scale_by_max)
         
         # 取合适的比例（偏向于平均值）
         arrow_scale = scale_by_avg
@@ -405,7 +724,7 @@ class DataProcessor:
         # 确保箭头比例在合理范围内
         arrow_scale = max(1.0, min(arrow_scale, 10.0))  # 限制在1.0到10.0之间
         
-        logger.info(f"最终箭头比例: {arrow_scale:.3f}")
+        logger.info("最终箭头比例: %.3f", arrow_scale)
         return arrow_scale
         
     def get_deviations(self) -> List[float]:
@@ -2,36 +2,100 @@
 可视化模块
 """
 import os
-import win32com.client
-import win32gui
-import win32con
-import ctypes
+import logging
 from typing import List, Tuple, Dict, Any, Optional
 from utils.logger import get_logger
-from utils.com_utils import ensure_com_initialized
 from config.settings import COLORS
 from functools import wraps
+from contextlib import contextmanager
+from concurrent.futures import Future
+from collections import OrderedDict
 import numpy as np
+import queue
 import time
-import pythoncom
+import pywintypes
 from PyQt6.QtWidgets import (
-    QGraphicsScene, QGraphicsView
+    QGraphicsScene, QGraphicsView, QGraphicsItem, QGraphicsItemGroup, QGraphicsSimpleTextItem
 )
-from PyQt6.QtCore import Qt, QRectF, QPointF
-from PyQt6.QtGui import QPainter, QPen, QColor, QBrush, QFont, QPainterPath
+from PyQt6.QtCore import Qt, QRectF, QPointF, QSizeF, QLineF, QThread, pyqtSignal
+from PyQt6.QtGui import QPainter, QPen, QBrush, QColor, QFont, QFontMetricsF, QPainterPath, QPicture, QStaticText, QTransform
 import math
 
 # 创建模块的logger
 logger = get_logger(__name__)
 
-def ensure_com_initialized(func):
-    """确保COM环境已初始化的装饰器"""
-    @wraps(func)
-    def wrapper(self, *args, **kwargs):
-        if not self.ensure_com_initialized():
-            return False, "COM环境初始化失败"
-        return func(self, *args, **kwargs)
-    return wrapper
+# pythoncom、win32com在首次使用CAD功能时才导入：导入pythoncom会在导入线程中初始化COM，
+# 只使用PreviewScene的纯Qt场景无需承担这部分开销
+
+def _require_com(failure: Any):
+    """确保COM环境已初始化的装饰器
+    
+    已初始化时只检查标志位，未初始化时才调用ensure_com_initialized。
+    
+    Args:
+        failure: 初始化失败时的返回值（不可变对象）
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(self, *args, **kwargs):
+            if not self._com_initialized and not self.ensure_com_initialized():
+                logger.error("CAD环境初始化失败")
+                return failure
+            return func(self, *args, **kwargs)
+        return wrapper
+    return decorator
+
+def _reconnect_on_com_error(error_msg: str):
+    """COM调用失败时重新初始化CAD连接并重试一次的装饰器
+    
+    已初始化时ensure_com_initialized只检查标志位，不再访问CAD对象；连接失效
+    （如AutoCAD被关闭或重启）由被装饰方法抛出的com_error发现。
+    被装饰方法开始添加实体后应自行处理com_error，不再抛出，避免重试时重复绘制。
+    
+    Args:
+        error_msg: 重试仍失败时记录的错误信息
+        
+    Returns:
+        装饰器，重试仍失败时被装饰方法返回False
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(self, *args, **kwargs):
+            try:
+                return func(self, *args, **kwargs)
+            except pywintypes.com_error as e:
+                logger.warning(f"CAD连接失效，重新初始化后重试: {e}")
+                self._com_initialized = False
+            try:
+                return func(self, *args, **kwargs)
+            except pywintypes.com_error as e:
+                logger.error(f"{error_msg}: {e}")
+                return False
+        return wrapper
+    return decorator
+
+# Regen方法参数：重生成所有视口（acAllViewports）
+_AC_ALL_VIEWPORTS = 1
+
+# 坐标轴箭头与轴线夹角（30度）的余弦、正弦值
+_COS30 = math.cos(math.pi / 6)
+_SIN30 = math.sin(math.pi / 6)
+
+# 预览骨架图录制时桩基圆的参考半径，显示时按实际半径缩放
+_SKELETON_RADIUS = 100.0
+# 保留的预览骨架图数量（按最近使用淘汰）
+_SKELETON_CACHE_SIZE = 8
+
+def _cosmetic_pen(color, width: float = 1) -> QPen:
+    """创建线宽不随缩放变换变化的画笔"""
+    pen = QPen(color, width)
+    pen.setCosmetic(True)
+    return pen
+
+# 预览画笔，模块内共享
+_PEN_BLACK = _cosmetic_pen(Qt.GlobalColor.black)
+_PEN_BLUE = _cosmetic_pen(Qt.GlobalColor.blue)
+_PEN_RED2 = _cosmetic_pen(Qt.GlobalColor.red, 2)
 
 class Visualizer:
     """可视化类"""
@@ -52,6 +116,7 @@ class Visualizer:
         self._com_initialized = False
         self._max_retries = 3
         self._retry_delay = 1  # 秒
+        self._draw_worker = None
         
     def ensure_com_initialized(self) -> bool:
         """确保COM环境已初始化
@@ -60,20 +125,17 @@ class Visualizer:
             bool: 是否成功初始化
         """
         if not self._com_initialized:
+            from utils.com_utils import get_autocad_application
             for attempt in range(self._max_retries):
                 try:
-                    # 尝试获取已存在的CAD应用程序实例
-                    self.app = win32com.client.GetActiveObject("AutoCAD.Application")
-                except:
-                    try:
-                        # 如果没有运行中的实例，创建新的
-                        self.app = win32com.client.Dispatch("AutoCAD.Application")
-                    except Exception as e:
-                        logger.error(f"CAD COM环境初始化失败 (尝试 {attempt + 1}/{self._max_retries}): {e}")
-                        if attempt < self._max_retries - 1:
-                            time.sleep(self._retry_delay)
-                            continue
-                        return False
+                    # 获取已存在的CAD应用程序实例，没有则创建新的（早绑定）
+                    self.app = get_autocad_application()
+                except Exception as e:
+                    logger.error(f"CAD COM环境初始化失败 (尝试 {attempt + 1}/{self._max_retries}): {e}")
+                    if attempt < self._max_retries - 1:
+                        time.sleep(self._retry_delay)
+                        continue
+                    return False
                 
                 try:
                     self.app.Visible = True
@@ -96,6 +158,7 @@ class Visualizer:
                 return False
         return True
     
+    @_require_com((False, "COM环境初始化失败"))
     def open_drawing(self, file_path: str) -> Tuple[bool, str]:
         """
         打开CAD图纸
@@ -116,6 +179,71 @@ class Visualizer:
             logger.error(error_msg)
             return False, error_msg
     
+    @contextmanager
+    def _suspend_updates(self):
+        """批量绘制期间暂停图形重生成，并将所有新建实体合并为一个撤销步骤
+        
+        结束时（包括发生异常时）恢复REGENMODE并重生成所有视口。
+        """
+        regen_mode = None
+        try:
+            regen_mode = self.doc.GetVariable("REGENMODE")
+            self.doc.SetVariable("REGENMODE", 0)
+            self.doc.StartUndoMark()
+        except Exception as e:
+            logger.warning(f"暂停图形更新失败: {e}")
+        try:
+            yield
+        finally:
+            try:
+                self.doc.EndUndoMark()
+                if regen_mode is not None:
+                    self.doc.SetVariable("REGENMODE", regen_mode)
+                self.doc.Regen(_AC_ALL_VIEWPORTS)
+            except Exception as e:
+                logger.warning(f"恢复图形更新失败: {e}")
+                
+    def _skeleton_block(self, axis_scale: float, axis_label_scale: float) -> str:
+        """获取桩基骨架图块，不存在时创建
+        
+        图块按单位桩基直径定义，包含蓝色桩基圆以及随块（BYBLOCK）颜色的坐标轴多段线和X、Y标签，
+        插入时按桩基直径统一缩放。图块名包含比例参数，样式变化时创建新图块，不修改已插入的块参照。
+        
+        Args:
+            axis_scale: 坐标轴比例
+            axis_label_scale: 坐标轴标签比例
+            
+        Returns:
+            str: 图块名称
+        """
+        name = f"PileDeviation_{axis_scale:g}_{axis_label_scale:g}".replace(".", "p").replace("-", "m")
+        try:
+            self.doc.Blocks.Item(name)
+            return name
+        except pywintypes.com_error:
+            pass
+            
+        import pythoncom
+        import win32com.client
+        from core._geom import axes_offsets
+        to_vba_point = lambda x, y: win32com.client.VARIANT(pythoncom.VT_ARRAY | pythoncom.VT_R8, (x, y, 0.0))
+        block = self.doc.Blocks.Add(to_vba_point(0.0, 0.0), name)
+        
+        circle = block.AddCircle(to_vba_point(0.0, 0.0), 0.5)
+        circle.Color = 5  # 蓝色
+        axes = block.AddLightWeightPolyline(win32com.client.VARIANT(
+            pythoncom.VT_ARRAY | pythoncom.VT_R8, axes_offsets(axis_scale).ravel().tolist()))
+        axes.Color = 0  # 随块
+        # 坐标轴标签，偏移标签高度的10%，避免与箭头重叠
+        label_offset = axis_scale + axis_label_scale * 0.1
+        for label, point in (("X", (label_offset, 0.0)), ("Y", (0.0, label_offset))):
+            text = block.AddText(label, to_vba_point(*point), axis_label_scale)
+            text.Color = 0  # 随块
+        logger.info(f"创建桩基骨架图块: {name}")
+        return name
+    
+    @_reconnect_on_com_error("绘制偏差数据失败")
+    @_require_com(False)
     def draw_deviation(self, matched_points: List[Tuple[Tuple[float, float], Tuple[float, float]]], 
                       pile_diameter: float, axis_scale: float, arrow_scale: float,
                       main_text_scale: float = 0.2, axis_label_scale: float = 0.15,
@@ -123,7 +251,7 @@ class Visualizer:
         """绘制偏差数据
         
         Args:
-            matched_points: 匹配后的点位列表
+            matched_points: 匹配后的点位序列（列表或(N, 2, 2)数组）
             pile_diameter: 桩基直径
             axis_scale: 坐标轴比例
             arrow_scale: 箭头比例
@@ -135,16 +263,12 @@ class Visualizer:
         Returns:
             bool: 是否成功
         """
+        drawing_started = False  # 是否已开始向模型空间添加实体
         try:
-            if not matched_points:
+            if len(matched_points) == 0:
                 logger.error("没有匹配的点位数据")
                 return False
                 
-            # 确保CAD环境已初始化
-            if not self.ensure_com_initialized():
-                logger.error("CAD环境初始化失败")
-                return False
-                
             # 更新样式
             self.style.update({
                 'pile_diameter': pile_diameter,
@@ -155,234 +279,135 @@ class Visualizer:
                 'angle_text_scale': angle_text_scale
             })
             
-            # 创建偏差图层
+            # 创建偏差图层（这是本方法的第一次COM调用）
             try:
                 deviation_layer = self.doc.Layers.Add("偏差分析")
                 deviation_layer.Color = 1  # 红色
-            except Exception as e:
+            except pywintypes.com_error as e:
                 logger.warning(f"创建图层失败（可能已存在）: {e}")
-                try:
-                    deviation_layer = self.doc.Layers.Item("偏差分析")
-                except:
-                    logger.error("无法创建或获取偏差分析图层")
-                    return False
+                # 获取已有图层仍失败时说明CAD连接已失效，com_error交给重连装饰器重试
+                deviation_layer = self.doc.Layers.Item("偏差分析")
             
             # 设置当前图层
             self.doc.ActiveLayer = deviation_layer
             
             # 转换为VBA数组格式的点
-            def to_vba_point(x: float, y: float) -> Any:
-                return win32com.client.VARIANT(pythoncom.VT_ARRAY | pythoncom.VT_R8, (x, y, 0.0))
+            import pythoncom
+            import win32com.client
+            VARIANT = win32com.client.VARIANT
+            VT_POINT = pythoncom.VT_ARRAY | pythoncom.VT_R8
+            to_vba_point = lambda x, y: VARIANT(VT_POINT, (x, y, 0.0))
+            # 文本插入点和箭头顶点各共用一个VARIANT对象，每次调用前只更新其值；
+            # 参数在COM调用时按值复制为SAFEARRAY，调用返回后即可复用
+            point_variant = VARIANT(VT_POINT, (0.0, 0.0, 0.0))
+            vertices_variant = VARIANT(VT_POINT, ())
             
-            success_count = 0
-            # 绘制每个点的偏差
-            for idx, (design_point, measured_point) in enumerate(matched_points):
-                try:
-                    # 计算偏差
-                    dx = float(measured_point[0]) - float(design_point[0])  # 确保是浮点数
-                    dy = float(measured_point[1]) - float(design_point[1])  # 确保是浮点数
-                    # 计算偏差并转换为毫米（坐标值可能是以米为单位）
-                    deviation = math.sqrt(dx**2 + dy**2) * 1000  # 转换为毫米
-                    deviation_mm = deviation  # 毫米单位
-                    
-                    # 获取高程值（如果有）
-                    elevation = None
-                    if elevations and idx < len(elevations):
-                        elevation = elevations[idx]
-                    
-                    # 计算偏差角度（与X轴的夹角，逆时针为正）
-                    # 使用数学坐标系，y轴向上为正，角度从x轴正向开始逆时针为正
-                    angle = math.degrees(math.atan2(dy, dx))  # 转换为度，逆时针方向为正
-                    if angle < 0:  # 确保角度为正值
-                        angle += 360
-                    
-                    # 转换坐标点为VBA格式（已经是毫米）
-                    center_point = to_vba_point(design_point[0], design_point[1])
-                    
-                    # 绘制桩基圆
-                    circle = self.modelspace.AddCircle(center_point, pile_diameter/2)  # 桩基直径已经是毫米
-                    circle.Layer = "偏差分析"
-                    circle.Color = 5  # 蓝色
-                    
-                    # 绘制坐标轴
-                    axis_length = pile_diameter * axis_scale  # 桩基直径已经是毫米
-                    # X轴
-                    x_axis = self.modelspace.AddLine(
-                        to_vba_point(design_point[0] - axis_length, design_point[1]),
-                        to_vba_point(design_point[0] + axis_length, design_point[1])
-                    )
-                    x_axis.Layer = "偏差分析"
-                    x_axis.Color = 0  # 黑色
-                    
-                    # Y轴
-                    y_axis = self.modelspace.AddLine(
-                        to_vba_point(design_point[0], design_point[1] - axis_length),
-                        to_vba_point(design_point[0], design_point[1] + axis_length)
-                    )
-                    y_axis.Layer = "偏差分析"
-                    y_axis.Color = 0  # 黑色
-                    
-                    # 绘制坐标轴箭头
-                    arrow_size = axis_length * 0.1  # 箭头大小为轴长的10%
-                    arrow_angle = math.pi / 6  # 30度
-                    
-                    # X轴箭头
-                    x_arrow_p1 = to_vba_point(
-                        design_point[0] + axis_length - arrow_size * math.cos(arrow_angle),
-                        design_point[1] - arrow_size * math.sin(arrow_angle)
-                    )
-                    x_arrow_p2 = to_vba_point(
-                        design_point[0] + axis_length - arrow_size * math.cos(-arrow_angle),
-                        design_point[1] - arrow_size * math.sin(-arrow_angle)
-                    )
-                    x_arrow_end = to_vba_point(design_point[0] + axis_length, design_point[1])
-                    self.modelspace.AddLine(x_arrow_end, x_arrow_p1).Color = 0
-                    self.modelspace.AddLine(x_arrow_end, x_arrow_p2).Color = 0
-                    
-                    # Y轴箭头
-                    y_arrow_p1 = to_vba_point(
-                        design_point[0] - arrow_size * math.sin(arrow_angle),
-                        design_point[1] + axis_length - arrow_size * math.cos(arrow_angle)
-                    )
-                    y_arrow_p2 = to_vba_point(
-                        design_point[0] + arrow_size * math.sin(arrow_angle),
-                        design_point[1] + axis_length - arrow_size * math.cos(arrow_angle)
-                    )
-                    y_arrow_end = to_vba_point(design_point[0], design_point[1] + axis_length)
-                    self.modelspace.AddLine(y_arrow_end, y_arrow_p1).Color = 0
-                    self.modelspace.AddLine(y_arrow_end, y_arrow_p2).Color = 0
-                    
-                    # 绘制坐标轴标签
-                    # X轴标签
-                    x_label_size = pile_diameter * self.style['axis_label_scale']
-                    x_label_offset = 10 * x_label_size / 100  # 调整偏移量，避免与箭头重叠
-                    x_label_point = to_vba_point(
-                        design_point[0] + axis_length + x_label_offset,
-                        design_point[1]
-                    )
-                    x_label_obj = self.modelspace.AddText("X", x_label_point, x_label_size)
-                    x_label_obj.Color = 0  # 黑色
-                    
-                    # Y轴标签
-                    y_label_size = pile_diameter * self.style['axis_label_scale']
-                    y_label_offset = 10 * y_label_size / 100  # 调整偏移量，避免与箭头重叠
-                    y_label_point = to_vba_point(
-                        design_point[0],
-                        design_point[1] + axis_length + y_label_offset
-                    )
-                    y_label_obj = self.modelspace.AddText("Y", y_label_point, y_label_size)
-                    y_label_obj.Color = 0  # 黑色
-                    
-                    # 绘制偏差箭头
-                    # 箭头长度使用桩基直径作为基准尺寸，但不对偏差值本身再乘以1000
-                    arrow_length = deviation_mm * arrow_scale  # 偏差值(mm) * 比例因子
-                    
-                    # 如果箭头长度太小，则设置一个最小值以确保可见性
-                    min_arrow_length = pile_diameter * 0.25  # 最小箭头长度为桩基直径的25%
-                    if arrow_length < min_arrow_length:
-                        arrow_length = min_arrow_length
-                        
-                    end_point = to_vba_point(
-                        design_point[0] + arrow_length * math.cos(math.radians(angle)),
-                        design_point[1] + arrow_length * math.sin(math.radians(angle))
-                    )
-                    arrow_line = self.modelspace.AddLine(center_point, end_point)
-                    arrow_line.Layer = "偏差分析"
-                    arrow_line.Color = 1  # 红色
-                    
-                    # 绘制箭头头部
-                    head_size = arrow_length * 0.2
-                    head_angle = math.pi / 6  # 30度
-                    angle_rad = math.radians(angle)
-                    
-                    arrow_p1 = to_vba_point(
-                        design_point[0] + arrow_length * math.cos(angle_rad) - head_size * math.cos(angle_rad + head_angle),
-                        design_point[1] + arrow_length * math.sin(angle_rad) - head_size * math.sin(angle_rad + head_angle)  # 注意这里是减号，为箭头方向计算
-                    )
-                    arrow_p2 = to_vba_point(
-                        design_point[0] + arrow_length * math.cos(angle_rad) - head_size * math.cos(angle_rad - head_angle),
-                        design_point[1] + arrow_length * math.sin(angle_rad) - head_size * math.sin(angle_rad - head_angle)  # 注意这里是减号，为箭头方向计算
-                    )
-                    
-                    self.modelspace.AddLine(end_point, arrow_p1).Color = 1  # 红色
-                    self.modelspace.AddLine(end_point, arrow_p2).Color = 1  # 红色
-                    
-                    # 绘制角度圆弧
-                    # 圆弧半径应该适中，既不太大也不太小
-                    arc_radius = min(arrow_length * 0.3, pile_diameter * 0.2)  # 选择合适的圆弧大小
-                    # 确保圆弧半径不会太小而无法看清
-                    min_arc_radius = pile_diameter * 0.1  # 最小圆弧半径为桩基直径的10%
-                    if arc_radius < min_arc_radius:
-                        arc_radius = min_arc_radius
+            def shared_point(x: float, y: float):
+                point_variant.value = (x, y, 0.0)
+                return point_variant
+                
+            # 模型空间对象及其绘图方法只获取一次，避免循环中重复解析COM方法
+            modelspace = self.modelspace or self.doc.ModelSpace
+            insert_block = modelspace.InsertBlock
+            add_polyline = modelspace.AddLightWeightPolyline
+            add_text = modelspace.AddText
+            add_arc = modelspace.AddArc
+            
+            # 在循环前一次性计算所有点位的多段线顶点、圆弧和文本位置（安装numba时JIT编译）
+            from core._geom import compute_point_geometry
+            pairs = np.asarray(matched_points, dtype=np.float64).reshape(len(matched_points), 2, -1)[:, :, :2]
+            design_arr = pairs[:, 0, :]
+            arrow_coords, text_info, arcs = compute_point_geometry(pairs, pile_diameter, arrow_scale)
+            # 每个点的多段线顶点按[x0, y0, x1, y1, ...]展平，供AddLightWeightPolyline使用
+            arrow_coords = arrow_coords.tolist()
+            # 角度和偏差标注先整体四舍五入为整数（与"%.0f"结果一致），循环中不再逐个格式化浮点数
+            angle_labels = [str(v) + "°" for v in np.rint(text_info[:, 2]).astype(np.int64).tolist()]
+            deviation_labels = [str(v) + "mm" for v in np.rint(text_info[:, 5]).astype(np.int64).tolist()]
+            text_info = text_info.tolist()
+            arcs = arcs.tolist()
+            
+            # 桩基圆、坐标轴及其标签对所有点位相同，定义为图块后每个点只插入一次块参照
+            skeleton_block = self._skeleton_block(axis_scale, self.style['axis_label_scale'])
+            # 文本大小
+            angle_text_size = pile_diameter * self.style['angle_text_scale']
+            deviation_text_size = pile_diameter * self.style['main_text_scale']
+            elev_text_size = pile_diameter * self.style['main_text_scale']  # 使用与主文本相同的比例
+            elev_offset_y = pile_diameter * 1.2  # 高程文本偏移到圆内下方位置，与预览保持一致
+            
+            design_list = design_arr.tolist()
+            # 转换坐标点为VBA格式（已经是毫米），圆和圆弧共用圆心
+            centers = [to_vba_point(x0, y0) for x0, y0 in design_list]
+            
+            def draw_black(idx: int):
+                # 插入桩基骨架块参照（图块按单位桩径定义，按桩基直径缩放）
+                insert_block(centers[idx], skeleton_block, pile_diameter, pile_diameter, 1.0, 0.0)
+                # 绘制偏差值文本
+                dev_x, dev_y = text_info[idx][3:5]
+                add_text(deviation_labels[idx], shared_point(dev_x, dev_y), deviation_text_size)
+                
+            def draw_red(idx: int):
+                # 绘制偏差箭头
+                vertices_variant.value = arrow_coords[idx]
+                add_polyline(vertices_variant)
+                
+            def draw_green(idx: int):
+                # 逆时针方向绘制角度圆弧
+                # 在CAD中，AutoCAD API的AddArc方法中，正角度表示逆时针，负角度表示顺时针
+                # 圆弧为绿色，无法并入黑色坐标轴或红色箭头多段线（一条多段线只能有一种颜色），
+                # 改用多段线近似并不能减少COM调用，因此保留精确的圆弧
+                arc_radius, end_angle = arcs[idx]
+                add_arc(
+                    centers[idx],
+                    arc_radius,
+                    0.0,  # 起始角度（水平向右）
+                    end_angle  # 终止角度（正值表示逆时针方向）
+                )
+                # 绘制角度文本（使用实际计算的角度）
+                ang_x, ang_y = text_info[idx][:2]
+                add_text(angle_labels[idx], shared_point(ang_x, ang_y), angle_text_size)
+                
+            def draw_elevation(idx: int):
+                # 绘制高程值（如果有）
+                if elevations is None or idx >= len(elevations):
+                    return
+                x0, y0 = design_list[idx]
+                # 将高程文本放在圆内底部的位置，与预览一致
+                elev_point = shared_point(x0, y0 + elev_offset_y)
+                elev_text = add_text(
+                    f"H={elevations[idx]:.3f}",
+                    elev_point,
+                    elev_text_size
+                )
+                elev_text.Alignment = 1  # 中心对齐
+                elev_text.TextAlignmentPoint = elev_point  # 设置对齐点
+                
+            failed = np.zeros(len(design_list), dtype=bool)  # 绘制失败的点位
+            
+            def draw_pass(color: str, draw_one):
+                # 先设置当前颜色，新建实体直接使用该颜色，无需逐个设置Color
+                self.doc.SetVariable("CECOLOR", color)
+                for idx in range(len(design_list)):
+                    if failed[idx]:
+                        continue
+                    try:
+                        draw_one(idx)
+                    except Exception as e:
+                        logger.error(f"绘制点位失败: {e}")
+                        failed[idx] = True
                         
-                    # 逆时针方向绘制圆弧
-                    start_angle = 0  # 起始角度（水平向右）
-                    end_angle = angle  # 终止角度（逆时针方向）
-                    # 在CAD中，AutoCAD API的AddArc方法中，正角度表示逆时针，负角度表示顺时针
-                    arc = self.modelspace.AddArc(
-                        center_point,
-                        arc_radius,
-                        math.radians(0),  # 起始角度（水平向右）
-                        math.radians(angle)  # 终止角度（正值表示逆时针方向）
-                    )
-                    arc.Color = 3  # 绿色
-                    
-                    # 绘制角度文本
-                    angle_text = f"{angle:.0f}°"  # 使用实际计算的角度
-                    # 计算文本位置，放在圆弧中间位置
-                    mid_angle = angle / 2  # 角度的一半
-                    mid_angle_rad = math.radians(mid_angle)  # 转换为弧度
-                    # 文本距离中心点的距离，比圆弧稍微大一点
-                    text_radius = arc_radius * 1.3  # 增加文本半径，避免与圆弧重叠
-                    # 计算文本位置坐标，使用数学坐标系计算（y轴向上为正）
-                    text_point = to_vba_point(
-                        design_point[0] + text_radius * math.cos(mid_angle_rad),
-                        design_point[1] + text_radius * math.sin(mid_angle_rad)  # 使用加号表示逆时针方向
-                    )
-                    # 使用angle_text_scale参数来控制文本大小
-                    angle_text_size = pile_diameter * self.style['angle_text_scale']
-                    angle_text_obj = self.modelspace.AddText(angle_text, text_point, angle_text_size)
-                    angle_text_obj.Color = 3  # 绿色
-                    
-                    # 绘制偏差值文本
-                    # 将文本放在箭头末端稍微偏移的位置，确保不与箭头重叠
-                    offset_distance = pile_diameter * 0.05  # 偏移距离
-                    text_point = to_vba_point(
-                        design_point[0] + (arrow_length + offset_distance) * math.cos(angle_rad),
-                        design_point[1] + (arrow_length + offset_distance) * math.sin(angle_rad)  # 使用加号表示逆时针方向
-                    )
-                    # 使用main_text_scale参数来控制偏差值文本大小
-                    deviation_text_size = pile_diameter * self.style['main_text_scale']
-                    text = self.modelspace.AddText(
-                        f"{deviation_mm:.0f}mm",
-                        text_point,
-                        deviation_text_size
-                    )
-                    text.Color = 0  # 黑色
-                    
-                    # 绘制高程值（如果有）
-                    if elevation is not None:
-                        # 将高程文本放在圆内底部的位置，与预览一致
-                        elev_offset_y = pile_diameter * 1.2  # 偏移到圆内下方位置，与预览保持一致
-                        elev_point = to_vba_point(
-                            design_point[0],
-                            design_point[1] + elev_offset_y
-                        )
-                        elev_text_size = pile_diameter * self.style['main_text_scale']  # 使用与主文本相同的比例
-                        elev_text = self.modelspace.AddText(
-                            f"H={elevation:.3f}",
-                            elev_point,
-                            elev_text_size
-                        )
-                        elev_text.Color = 4  # 青色
-                        elev_text.Alignment = 1  # 中心对齐
-                        elev_text.TextAlignmentPoint = elev_point  # 设置对齐点
+            # 按颜色分组绘制每个点的偏差，期间暂停重生成并将本次绘制合并为一个撤销步骤
+            with self._suspend_updates():
+                current_color = self.doc.GetVariable("CECOLOR")
+                drawing_started = True
+                try:
+                    draw_pass("BYBLOCK", draw_black)  # 黑色
+                    draw_pass("1", draw_red)  # 红色
+                    draw_pass("3", draw_green)  # 绿色
+                    draw_pass("4", draw_elevation)  # 青色
+                finally:
+                    self.doc.SetVariable("CECOLOR", current_color)
                     
-                    success_count += 1
-                except Exception as e:
-                    logger.error(f"绘制点位失败: {e}")
-                    continue
-            
+            success_count = int(np.count_nonzero(~failed))
             if success_count > 0:
                 logger.info(f"成功绘制 {success_count}/{len(matched_points)} 个点的偏差")
                 return True
@@ -390,10 +415,52 @@ class Visualizer:
                 logger.error("所有点位绘制失败")
                 return False
                 
+        except pywintypes.com_error as e:
+            # 开始添加实体后不再重连重试，否则已绘制成功的点位会被重复绘制
+            if drawing_started:
+                logger.error(f"绘制偏差数据失败: {e}")
+                return False
+            raise
         except Exception as e:
             logger.error(f"绘制偏差数据失败: {e}")
             return False
             
+    def draw_deviation_async(self, matched_points: List[Tuple[Tuple[float, float], Tuple[float, float]]],
+                             pile_diameter: float, axis_scale: float, arrow_scale: float,
+                             main_text_scale: float = 0.2, axis_label_scale: float = 0.15,
+                             angle_text_scale: float = 0.5, elevations: List[float] = None,
+                             callback=None) -> Future:
+        """在后台STA线程中绘制偏差数据，避免批量写入CAD时阻塞界面
+        
+        Args:
+            matched_points: 匹配后的点位序列（列表或(N, 2, 2)数组）
+            pile_diameter: 桩基直径
+            axis_scale: 坐标轴比例
+            arrow_scale: 箭头比例
+            main_text_scale: 主文本比例
+            axis_label_scale: 坐标轴标签比例
+            angle_text_scale: 角度文本比例
+            elevations: 高程值列表
+            callback: 绘制完成后在主线程中调用的回调函数，参数为Future
+            
+        Returns:
+            Future: 结果为是否成功绘制
+        """
+        if self._draw_worker is None:
+            self._draw_worker = _DrawWorker()
+            self._draw_worker.start()
+        return self._draw_worker.submit(
+            'draw_deviation',
+            (matched_points, pile_diameter, axis_scale, arrow_scale,
+             main_text_scale, axis_label_scale, angle_text_scale, elevations),
+            callback)
+    
+    def shutdown(self):
+        """停止后台绘制线程，等待已提交的绘制任务完成"""
+        if self._draw_worker is not None:
+            self._draw_worker.stop()
+            self._draw_worker = None
+            
     def update_style(self, pile_diameter: float = 10000, axis_scale: float = 1.5, 
                     arrow_scale: float = 0.3, main_text_scale: float = 0.5,
                     axis_label_scale: float = 0.6, angle_text_scale: float = 0.5) -> bool:
@@ -449,22 +516,20 @@ class Visualizer:
             # 计算箭头方向
             dx = end[0] - start[0]
             dy = end[1] - start[1]
-            length = (dx**2 + dy**2)**0.5
+            length = math.hypot(dx, dy)
             
             # 计算箭头大小
             arrow_size = length * self.style['arrow_scale']
             
-            # 计算箭头端点
-            angle = np.arctan2(dy, dx)
-            arrow_angle = np.pi/6  # 30度
-            
+            # 计算箭头端点：箭头两翼方向由单位方向向量旋转±30度得到，无需atan2/cos/sin
+            ux, uy = (dx / length, dy / length) if length > 0 else (1.0, 0.0)
             arrow1 = (
-                end[0] - arrow_size * np.cos(angle + arrow_angle),
-                end[1] - arrow_size * np.sin(angle + arrow_angle)
+                end[0] - arrow_size * (ux * _COS30 - uy * _SIN30),
+                end[1] - arrow_size * (uy * _COS30 + ux * _SIN30)
             )
             arrow2 = (
-                end[0] - arrow_size * np.cos(angle - arrow_angle),
-                end[1] - arrow_size * np.sin(angle - arrow_angle)
+                end[0] - arrow_size * (ux * _COS30 + uy * _SIN30),
+                end[1] - arrow_size * (uy * _COS30 - ux * _SIN30)
             )
             
             # 绘制箭头
@@ -492,6 +557,7 @@ class Visualizer:
         except Exception as e:
             logger.error(f"绘制文本失败: {e}")
     
+    @_require_com(False)
     def highlight_entities(self, entities: List[Any], highlight: bool = True, color: int = 1) -> bool:
         """
         高亮显示实体
@@ -509,13 +575,13 @@ class Visualizer:
                 return False
                 
             for entity in entities:
-                if hasattr(entity, 'Color'):
-                    entity.Color = color if highlight else 0
+                entity.Color = color if highlight else 0
             return True
-        except Exception as e:
+        except pywintypes.com_error as e:
             logger.error(f"高亮显示实体失败: {e}")
             return False
     
+    @_require_com(False)
     def zoom_to_entities(self, entities: List[Any]) -> bool:
         """
         缩放视图以显示指定实体
@@ -526,30 +592,31 @@ class Visualizer:
         Returns:
             bool: 是否成功
         """
-        if not self.ensure_com_initialized():
-            return False
-            
         try:
             if not self.doc or not entities:
                 return False
                 
-            # 计算边界框
-            min_x = min_y = min_z = float('inf')
-            max_x = max_y = max_z = float('-inf')
-            
+            # 收集各实体包围盒的角点，一次性求出整体范围
+            corners = []
             for entity in entities:
-                if hasattr(entity, 'Coordinates'):
-                    coords = entity.Coordinates
-                    min_x = min(min_x, coords[0])
-                    min_y = min(min_y, coords[1])
-                    min_z = min(min_z, coords[2])
-                    max_x = max(max_x, coords[0])
-                    max_y = max(max_y, coords[1])
-                    max_z = max(max_z, coords[2])
-                    
-            # 设置视图范围
-            self.app.ZoomExtents()
-            
+                try:
+                    min_point, max_point = entity.GetBoundingBox()
+                except pywintypes.com_error:
+                    continue
+                corners.append(min_point[:2])
+                corners.append(max_point[:2])
+                
+            if corners:
+                import pythoncom
+                import win32com.client
+                corners = np.asarray(corners, dtype=np.float64)
+                lower, upper = corners.min(axis=0), corners.max(axis=0)
+                to_vba_point = lambda x, y: win32com.client.VARIANT(pythoncom.VT_ARRAY | pythoncom.VT_R8, (x, y, 0.0))
+                self.app.ZoomWindow(to_vba_point(*lower.tolist()), to_vba_point(*upper.tolist()))
+            else:
+                # 无法获取任何实体的包围盒时退回到缩放至图形范围
+                self.app.ZoomExtents()
+                
             logger.info("成功调整视图范围")
             return True
             
@@ -557,6 +624,7 @@ class Visualizer:
             logger.error(f"调整视图范围失败: {e}")
             return False
     
+    @_require_com(False)
     def create_deviation_report(self, analysis: Dict[str, Any], output_path: str) -> bool:
         """
         创建偏差报告
@@ -576,42 +644,60 @@ class Visualizer:
             report_layer = self.doc.Layers.Add("偏差报告")
             report_layer.Color = COLORS['report']
             
-            # 添加报告标题
-            title = f"偏差分析报告 (总点数: {analysis['total_points']})"
-            title_point = (0, 0, 0)
-            title_text = self.doc.ModelSpace.AddText(
-                title,
-                title_point,
-                2.0
-            )
-            title_text.Layer = "偏差报告"
-            
-            # 添加统计信息
-            stats = [
-                f"正常点数: {analysis['normal_points']}",
-                f"超限点数: {analysis['exceeded_points']}",
-                f"平均偏差: {analysis['deviation_stats']['mean']:.3f}",
-                f"最大偏差: {analysis['deviation_stats']['max']:.3f}",
-                f"最小偏差: {analysis['deviation_stats']['min']:.3f}",
-                f"标准差: {analysis['deviation_stats']['std']:.3f}"
-            ]
-            
-            for i, stat in enumerate(stats):
-                stat_point = (0, -2 * (i + 1), 0)
-                stat_text = self.doc.ModelSpace.AddText(
-                    stat,
-                    stat_point,
-                    1.0
-                )
-                stat_text.Layer = "偏差报告"
+            modelspace = self.modelspace or self.doc.ModelSpace
             
+            # 报告文本直接创建在当前图层上，无需逐个设置Layer属性
+            previous_layer = self.doc.ActiveLayer
+            self.doc.ActiveLayer = report_layer
+            try:
+                self._add_report_text(modelspace, analysis)
+            finally:
+                self.doc.ActiveLayer = previous_layer
+                
             # 保存图纸
             self.doc.SaveAs(output_path)
             return True
         except Exception as e:
             logger.error(f"创建偏差报告失败: {e}")
             return False
+            
+    @staticmethod
+    def _add_report_text(modelspace: Any, analysis: Dict[str, Any]):
+        """在当前图层上添加报告标题和统计信息文本
+        
+        Args:
+            modelspace: 模型空间对象
+            analysis: 偏差分析结果
+        """
+        # 添加报告标题
+        title = f"偏差分析报告 (总点数: {analysis['total_points']})"
+        title_point = (0, 0, 0)
+        modelspace.AddText(
+            title,
+            title_point,
+            2.0
+        )
+        
+        # 添加统计信息
+        stats = [
+            f"正常点数: {analysis['normal_points']}",
+            f"超限点数: {analysis['exceeded_points']}",
+            f"平均偏差: {analysis['deviation_stats']['mean']:.3f}",
+            f"最大偏差: {analysis['deviation_stats']['max']:.3f}",
+            f"最小偏差: {analysis['deviation_stats']['min']:.3f}",
+            f"标准差: {analysis['deviation_stats']['std']:.3f}"
+        ]
+        
+        for i, stat in enumerate(stats):
+            stat_point = (0, -2 * (i + 1), 0)
+            modelspace.AddText(
+                stat,
+                stat_point,
+                1.0
+            )
     
+    @_reconnect_on_com_error("重置可视化状态失败")
+    @_require_com(False)
     def reset_visualization(self) -> bool:
         """
         重置可视化状态
@@ -619,28 +705,319 @@ class Visualizer:
         Returns:
             bool: 是否成功
         """
-        if not self.ensure_com_initialized():
+        if not self.doc:
             return False
             
+        # 清除所有颜色
+        modelspace = self.modelspace or self.doc.ModelSpace
+        for entity in modelspace:
+            entity.Color = 0
+            
+        logger.info("成功重置可视化状态")
+        return True
+
+class _DrawWorker(QThread):
+    """CAD绘制工作线程
+    
+    线程以单线程套间（STA）初始化COM，并持有自己的Visualizer及AutoCAD对象，
+    所有COM代理都只在该线程内使用，无需跨套间封送。空闲时处理COM消息队列。
+    """
+    
+    # 任务完成信号：(回调函数, Future)，由Qt排队到主线程执行回调
+    job_done = pyqtSignal(object, object)
+    
+    def __init__(self):
+        super().__init__()
+        self._jobs = queue.Queue()
+        self.job_done.connect(self._on_job_done)
+        
+    def submit(self, method: str, args: tuple, callback=None) -> Future:
+        """提交绘制任务
+        
+        Args:
+            method: 要在工作线程Visualizer上调用的方法名
+            args: 方法参数
+            callback: 任务完成后在主线程中调用的回调函数
+            
+        Returns:
+            Future: 任务结果
+        """
+        future = Future()
+        self._jobs.put((method, args, callback, future))
+        return future
+    
+    def stop(self):
+        """请求线程在处理完已提交的任务后退出，并等待其结束"""
+        self._jobs.put(None)
+        self.wait()
+        
+    def run(self):
+        import pythoncom
+        pythoncom.CoInitialize()
         try:
-            if not self.doc:
-                return False
-                
-            # 清除所有颜色
-            for entity in self.doc.ModelSpace:
-                if hasattr(entity, 'Color'):
-                    entity.Color = 0
+            visualizer = Visualizer()
+            while True:
+                try:
+                    job = self._jobs.get(timeout=0.1)
+                except queue.Empty:
+                    pythoncom.PumpWaitingMessages()
+                    continue
+                if job is None:
+                    break
                     
-            logger.info("成功重置可视化状态")
-            return True
+                method, args, callback, future = job
+                if not future.set_running_or_notify_cancel():
+                    continue
+                try:
+                    future.set_result(getattr(visualizer, method)(*args))
+                except Exception as e:
+                    logger.error(f"后台绘制任务失败: {e}")
+                    future.set_exception(e)
+                self.job_done.emit(callback, future)
+        finally:
+            pythoncom.CoUninitialize()
             
-        except Exception as e:
-            logger.error(f"重置可视化状态失败: {e}")
-            return False
+    @staticmethod
+    def _on_job_done(callback, future: Future):
+        if callback is not None:
+            callback(future)
+
+class _PictureItem(QGraphicsItem):
+    """回放QPicture的图形项（PyQt6未提供QGraphicsPictureItem）"""
+    
+    def __init__(self, picture: QPicture, rect: QRectF):
+        super().__init__()
+        self._picture = picture
+        self._rect = rect
+        
+    def picture(self) -> QPicture:
+        return self._picture
+    
+    def set_picture(self, picture: QPicture, rect: QRectF):
+        self.prepareGeometryChange()
+        self._picture = picture
+        self._rect = rect
+        self.update()
+        
+    def boundingRect(self) -> QRectF:
+        return self._rect
+    
+    def paint(self, painter, option, widget=None):
+        painter.drawPicture(0, 0, self._picture)
+
+class _StaticLabelItem(QGraphicsItem):
+    """使用QStaticText绘制的单行标签，字形布局只在创建QStaticText时计算一次"""
+    
+    def __init__(self, color):
+        super().__init__()
+        self._pen = QPen(QColor(color))
+        self._static = QStaticText()
+        self._font = QFont()
+        self._size = QSizeF()
+        
+    def set_static_text(self, static: QStaticText, font: QFont):
+        """切换为已准备好布局的静态文本
+        
+        Args:
+            static: 已按font调用prepare的静态文本
+            font: 绘制字体，须与准备布局时的字体一致，否则绘制时会重新布局
+        """
+        if static is self._static:
+            return
+        self.prepareGeometryChange()
+        self._static = static
+        self._font = font
+        self._size = static.size()
+        self.update()
+        
+    def size(self) -> QSizeF:
+        return self._size
+    
+    def boundingRect(self) -> QRectF:
+        return QRectF(QPointF(0, 0), self._size)
+    
+    def paint(self, painter, option, widget=None):
+        painter.setFont(self._font)
+        painter.setPen(self._pen)
+        painter.drawStaticText(QPointF(0, 0), self._static)
 
 class PreviewScene(QGraphicsScene):
     """预览场景类"""
     
+    # 静态文本缓存：{(文本, 字号): (QStaticText, QFont)}，所有预览场景共用
+    _static_texts = {}
+    # 字体缓存：{字号: QFont}，所有预览场景共用
+    _fonts = {}
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        # 场景中只有少量图形项，无需维护BSP索引
+        self.setItemIndexMethod(QGraphicsScene.ItemIndexMethod.NoIndex)
+        # 当前使用的桩基圆、坐标轴、示例箭头骨架图
+        self._skeleton = None
+        self._skeleton_rect = QRectF()
+        self._skeleton_key = None
+        # 最近使用过的骨架图：{(坐标轴比例, 箭头比例): (QPicture, 包围矩形)}
+        self._skeletons = OrderedDict()
+        # 预览图形项只创建一次，样式变化时更新属性；组的原点为桩基圆心
+        self._group = None
+        self._skeleton_item = None
+        self._elev_text = None
+        self._deviation_text = None
+        self._angle_text = None
+        self._x_label = None
+        self._y_label = None
+        # 上次绘制预览时的视图尺寸和样式参数，相同时跳过重绘
+        self._preview_key = None
+        
+    def _ensure_items(self):
+        """创建预览图形项并加入图形项组
+        
+        各图形项启用DeviceCoordinateCache，内容未变化时直接使用缓存的位图；
+        视图尺寸变化只平移图形项组，平移不会使缓存失效。
+        """
+        if self._group is not None:
+            return
+            
+        def text_item(text: str, color) -> QGraphicsSimpleTextItem:
+            # 纯文本标注不需要QGraphicsTextItem的富文本文档，使用轻量的简单文本项
+            item = QGraphicsSimpleTextItem(text)
+            item.setBrush(QBrush(QColor(color)))
+            return item
+            
+        self._skeleton_item = _PictureItem(QPicture(), QRectF())
+        self._elev_text = text_item("H=123.456", QColor(0, 170, 170))  # 青色
+        self._deviation_text = text_item("50mm", Qt.GlobalColor.black)
+        self._angle_text = text_item("45°", Qt.GlobalColor.blue)
+        self._x_label = _StaticLabelItem(Qt.GlobalColor.black)
+        self._y_label = _StaticLabelItem(Qt.GlobalColor.black)
+        
+        self._group = QGraphicsItemGroup()
+        for item in (self._skeleton_item, self._elev_text, self._deviation_text,
+                     self._angle_text, self._x_label, self._y_label):
+            item.setCacheMode(QGraphicsItem.CacheMode.DeviceCoordinateCache)
+            self._group.addToGroup(item)
+        self.addItem(self._group)
+        
+    @classmethod
+    def _font(cls, point_size: int) -> QFont:
+        """获取指定字号的字体，同一字号共用一个QFont对象
+        
+        Args:
+            point_size: 字号
+            
+        Returns:
+            QFont: 字体
+        """
+        font = cls._fonts.get(point_size)
+        if font is None:
+            font = cls._fonts[point_size] = QFont()
+            font.setPointSize(point_size)
+        return font
+    
+    @classmethod
+    def _static_text(cls, text: str, point_size: int) -> Tuple[QStaticText, QFont]:
+        """获取指定文本和字号的静态文本，首次使用时创建并准备布局
+        
+        Args:
+            text: 文本内容
+            point_size: 字号
+            
+        Returns:
+            Tuple[QStaticText, QFont]: (静态文本, 对应字体)
+        """
+        key = (text, point_size)
+        cached = cls._static_texts.get(key)
+        if cached is None:
+            font = cls._font(point_size)
+            static = QStaticText(text)
+            static.setPerformanceHint(QStaticText.PerformanceHint.AggressiveCaching)
+            static.prepare(QTransform(), font)
+            cached = cls._static_texts[key] = (static, font)
+        return cached
+    
+    @classmethod
+    def _set_point_size(cls, item: QGraphicsSimpleTextItem, size: int):
+        """设置文本字号，字号未变化时不重设字体，避免缓存失效"""
+        if item.font().pointSize() != size:
+            item.setFont(cls._font(size))
+            
+    def _build_skeleton(self, axis_scale: float, arrow_scale: float):
+        """按参考半径录制桩基圆、坐标轴和示例箭头骨架图，最近用过的比例直接复用
+        
+        预览中桩基圆的像素半径只取决于视图尺寸，与桩基直径无关，因此骨架图只随
+        坐标轴比例和箭头比例变化，显示时通过缩放变换适配视图。
+        
+        Args:
+            axis_scale: 坐标轴长度比例
+            arrow_scale: 箭头长度比例
+        """
+        key = (axis_scale, arrow_scale)
+        if self._skeleton is not None and self._skeleton_key == key:
+            return
+        cached = self._skeletons.get(key)
+        if cached is not None:
+            self._skeletons.move_to_end(key)
+            self._skeleton, self._skeleton_rect = cached
+            self._skeleton_key = key
+            return
+            
+        radius = _SKELETON_RADIUS
+        axis_length = radius * axis_scale
+        axis_arrow_size = axis_length * 0.1  # 坐标轴箭头大小为轴长的10%
+        arrow_length = radius * arrow_scale
+        arrow_rad = math.radians(45)  # 示例偏差箭头角度
+        end_x = arrow_length * math.cos(arrow_rad)
+        end_y = -arrow_length * math.sin(arrow_rad)
+        head_size = arrow_length * 0.2
+        head_angle = math.pi / 6  # 30度
+        arc_radius = arrow_length * 0.3  # 圆弧半径为箭头长度的30%
+        
+        picture = QPicture()
+        painter = QPainter(picture)
+        try:
+            # 桩基圆
+            painter.setPen(_PEN_BLUE)
+            painter.drawEllipse(QPointF(0, 0), radius, radius)
+            
+            # 坐标轴及其箭头
+            painter.setPen(_PEN_BLACK)
+            painter.drawLine(QLineF(-axis_length, 0, axis_length, 0))
+            painter.drawLine(QLineF(axis_length, 0, axis_length - axis_arrow_size * _COS30, -axis_arrow_size * _SIN30))
+            painter.drawLine(QLineF(axis_length, 0, axis_length - axis_arrow_size * _COS30, axis_arrow_size * _SIN30))
+            painter.drawLine(QLineF(0, -axis_length, 0, axis_length))
+            painter.drawLine(QLineF(0, -axis_length, -axis_arrow_size * _SIN30, -axis_length + axis_arrow_size * _COS30))
+            painter.drawLine(QLineF(0, -axis_length, axis_arrow_size * _SIN30, -axis_length + axis_arrow_size * _COS30))
+            
+            # 示例偏差箭头及箭头翼
+            painter.setPen(_PEN_RED2)
+            painter.drawLine(QLineF(0, 0, end_x, end_y))
+            painter.drawLine(QLineF(end_x, end_y,
+                                    end_x - head_size * math.cos(arrow_rad - head_angle),
+                                    end_y + head_size * math.sin(arrow_rad - head_angle)))
+            painter.drawLine(QLineF(end_x, end_y,
+                                    end_x - head_size * math.cos(arrow_rad + head_angle),
+                                    end_y + head_size * math.sin(arrow_rad + head_angle)))
+            
+            # 角度圆弧
+            arc_path = QPainterPath()
+            arc_path.moveTo(arc_radius, 0)  # 从水平右侧开始
+            arc_path.arcTo(-arc_radius, -arc_radius, arc_radius * 2, arc_radius * 2, 0, 45)
+            painter.setPen(_PEN_BLUE)
+            painter.drawPath(arc_path)
+        finally:
+            painter.end()
+            
+        # 留出余量，避免线宽和抗锯齿被边界裁剪
+        extent = max(radius, axis_length, arrow_length)
+        extent += extent * 0.1
+        self._skeleton = picture
+        self._skeleton_rect = QRectF(-extent, -extent, extent * 2, extent * 2)
+        self._skeleton_key = key
+        self._skeletons[key] = (picture, self._skeleton_rect)
+        while len(self._skeletons) > _SKELETON_CACHE_SIZE:
+            self._skeletons.popitem(last=False)
+        
     def draw_deviation(self, pile_diameter, axis_scale, arrow_scale, 
                       main_text_scale, axis_label_scale, angle_text_scale):
         """绘制偏差预览
@@ -654,9 +1031,6 @@ class PreviewScene(QGraphicsScene):
             angle_text_scale: 角度文本比例
         """
         try:
-            # 清空场景
-            self.clear()
-            
             # 获取视图尺寸
             view = self.views()[0]
             view_width = view.width()
@@ -666,194 +1040,87 @@ class PreviewScene(QGraphicsScene):
                 logger.warning("预览视图尺寸无效")
                 return
                 
+            # 视图尺寸和样式参数均未变化时，场景内容与上次完全相同
+            preview_key = (view_width, view_height, pile_diameter, axis_scale, arrow_scale,
+                           main_text_scale, axis_label_scale, angle_text_scale)
+            if preview_key == self._preview_key:
+                return True
+                
+            # 更新图形项期间屏蔽场景信号，全部完成后统一刷新视图
+            self.blockSignals(True)
+            
             # 计算缩放比例
             scale = min(view_width, view_height) / (pile_diameter * 3)
             
-            # 计算中心点
+            # 计算中心点，以下各图形项的位置均相对于中心点
             center_x = view_width / 2
             center_y = view_height / 2
+            self._ensure_items()
+            self._group.setPos(center_x, center_y)
             
             # 设置基准文本大小（使用固定值）
             base_text_size = 20  # 基准大小设为20pt
             
-            # 绘制桩基圆
+            # 回放骨架图（桩基圆、坐标轴、示例箭头、角度圆弧）
             radius = pile_diameter / 2 * scale
-            circle = self.addEllipse(
-                center_x - radius,
-                center_y - radius,
-                radius * 2,
-                radius * 2,
-                QPen(Qt.GlobalColor.blue),
-                QBrush(Qt.GlobalColor.transparent)
-            )
+            self._build_skeleton(axis_scale, arrow_scale)
+            if self._skeleton_item.picture() is not self._skeleton:
+                self._skeleton_item.set_picture(self._skeleton, self._skeleton_rect)
+            self._skeleton_item.setTransform(QTransform.fromScale(radius / _SKELETON_RADIUS, radius / _SKELETON_RADIUS))
             
-            # 绘制高程值（示例）
-            # 将高程文本放在圆内底部的位置
-            elev_offset_y = radius * 1.2  # 与实际绘制位置保持一致 (pile_diameter * 0.6 对应 radius * 0.6)
-            elev_text_size = int(base_text_size * main_text_scale)  # 使用与主文本相同的比例
-            
-            elev_text = self.addText("H=123.456")
-            elev_text.setDefaultTextColor(QColor(0, 170, 170))  # 青色
-            font = QFont()
-            font.setPointSize(elev_text_size)
-            elev_text.setFont(font)
-            
-            # 计算文本位置使其居中
-            elev_text_width = elev_text.boundingRect().width()
-            elev_text_height = elev_text.boundingRect().height()
-            elev_text.setPos(
-                center_x - elev_text_width/2,
-                center_y + elev_offset_y - elev_text_height/2
-            )
-            
-            # 绘制坐标轴
+            # 文本标注所需的几何尺寸
             axis_length = radius * axis_scale
-            axis_arrow_size = axis_length * 0.1  # 坐标轴箭头大小为轴长的10%
-            axis_arrow_angle = math.pi / 6  # 30度
-
-            # X轴及其箭头
-            self.addLine(
-                center_x - axis_length,
-                center_y,
-                center_x + axis_length,
-                center_y,
-                QPen(Qt.GlobalColor.black)
-            )
-            # X轴箭头
-            x_arrow_p1_x = center_x + axis_length - axis_arrow_size * math.cos(axis_arrow_angle)
-            x_arrow_p1_y = center_y - axis_arrow_size * math.sin(axis_arrow_angle)
-            x_arrow_p2_x = center_x + axis_length - axis_arrow_size * math.cos(-axis_arrow_angle)
-            x_arrow_p2_y = center_y - axis_arrow_size * math.sin(-axis_arrow_angle)
-            self.addLine(center_x + axis_length, center_y, x_arrow_p1_x, x_arrow_p1_y, QPen(Qt.GlobalColor.black))
-            self.addLine(center_x + axis_length, center_y, x_arrow_p2_x, x_arrow_p2_y, QPen(Qt.GlobalColor.black))
-
-            # Y轴及其箭头
-            self.addLine(
-                center_x,
-                center_y - axis_length,
-                center_x,
-                center_y + axis_length,
-                QPen(Qt.GlobalColor.black)
-            )
-            # Y轴箭头
-            y_arrow_p1_x = center_x - axis_arrow_size * math.sin(axis_arrow_angle)
-            y_arrow_p1_y = center_y - axis_length + axis_arrow_size * math.cos(axis_arrow_angle)
-            y_arrow_p2_x = center_x + axis_arrow_size * math.sin(axis_arrow_angle)
-            y_arrow_p2_y = center_y - axis_length + axis_arrow_size * math.cos(axis_arrow_angle)
-            self.addLine(center_x, center_y - axis_length, y_arrow_p1_x, y_arrow_p1_y, QPen(Qt.GlobalColor.black))
-            self.addLine(center_x, center_y - axis_length, y_arrow_p2_x, y_arrow_p2_y, QPen(Qt.GlobalColor.black))
-            
-            # 绘制示例偏差箭头（45度角）
             arrow_length = radius * arrow_scale
-            arrow_angle = 45  # 度
-            arrow_rad = math.radians(arrow_angle)
-            end_x = center_x + arrow_length * math.cos(arrow_rad)
-            end_y = center_y - arrow_length * math.sin(arrow_rad)
-            
-            # 绘制箭头主体
-            arrow_line = self.addLine(
-                center_x,
-                center_y,
-                end_x,
-                end_y,
-                QPen(Qt.GlobalColor.red, 2)
-            )
-            
-            # 绘制箭头头部
-            head_size = arrow_length * 0.2
-            head_angle = math.pi / 6  # 30度
-            angle = math.atan2(center_y - end_y, end_x - center_x)
+            arrow_rad = math.radians(45)
+            end_x = arrow_length * math.cos(arrow_rad)
+            end_y = -arrow_length * math.sin(arrow_rad)
+            arc_radius = arrow_length * 0.3
             
-            # 箭头两个翼的端点
-            p1_x = end_x - head_size * math.cos(angle - head_angle)
-            p1_y = end_y + head_size * math.sin(angle - head_angle)
-            p2_x = end_x - head_size * math.cos(angle + head_angle)
-            p2_y = end_y + head_size * math.sin(angle + head_angle)
-            
-            # 绘制箭头翼
-            self.addLine(end_x, end_y, p1_x, p1_y, QPen(Qt.GlobalColor.red, 2))
-            self.addLine(end_x, end_y, p2_x, p2_y, QPen(Qt.GlobalColor.red, 2))
+            # 高程值（示例），放在圆内底部的位置并居中
+            elev_offset_y = radius * 1.2  # 与实际绘制位置保持一致 (pile_diameter * 0.6 对应 radius * 0.6)
+            # 文本尺寸由字体度量直接计算，高程和偏差文本字号相同，共用一个度量对象
+            self._set_point_size(self._elev_text, int(base_text_size * main_text_scale))  # 使用与主文本相同的比例
+            self._set_point_size(self._deviation_text, int(base_text_size * main_text_scale))
+            self._set_point_size(self._angle_text, int(base_text_size * angle_text_scale))
+            main_metrics = QFontMetricsF(self._elev_text.font())
+            angle_metrics = QFontMetricsF(self._angle_text.font())
             
-            # 设置基准文本大小（使用固定值）
-            base_text_size = 20  # 基准大小设为12pt
-            
-            # 绘制偏差值文本
-            deviation_text = "50mm"
-            text_item = self.addText(deviation_text)
-            text_item.setDefaultTextColor(Qt.GlobalColor.black)
-            font = QFont()
-            font.setPointSize(int(base_text_size * main_text_scale))  # 转换为整数
-            text_item.setFont(font)
-            
-            # 将文本放置在箭头末端
-            text_width = text_item.boundingRect().width()
-            text_height = text_item.boundingRect().height()
-            text_item.setPos(end_x - text_width/2, end_y - text_height - 5)
-            
-            # 绘制角度圆弧
-            arc_radius = arrow_length * 0.3  # 圆弧半径为箭头长度的30%
-            arc_path = QPainterPath()
-            arc_path.moveTo(center_x + arc_radius, center_y)  # 从水平右侧开始
-            arc_path.arcTo(
-                center_x - arc_radius,
-                center_y - arc_radius,
-                arc_radius * 2,
-                arc_radius * 2,
-                0,  # 起始角度（水平向右）
-                45  # 顺时针旋转45度（与箭头角度相同）
-            )
-            self.addPath(arc_path, QPen(Qt.GlobalColor.blue, 1))
+            elev_width = main_metrics.horizontalAdvance(self._elev_text.text())
+            self._elev_text.setPos(-elev_width/2, elev_offset_y - main_metrics.height()/2)
             
-            # 绘制角度文本
-            angle_text = "45°"
-            angle_text_item = self.addText(angle_text)
-            angle_text_item.setDefaultTextColor(Qt.GlobalColor.blue)
-            font = QFont()
-            font.setPointSize(int(base_text_size * angle_text_scale))  # 转换为整数
-            angle_text_item.setFont(font)
+            # 偏差值文本，放置在箭头末端
+            text_width = main_metrics.horizontalAdvance(self._deviation_text.text())
+            self._deviation_text.setPos(end_x - text_width/2, end_y - main_metrics.height() - 5)
             
-            # 将角度文本放置在圆弧中间偏上位置
+            # 角度文本，放置在圆弧中间偏上位置
             mid_angle_rad = math.radians(22.5)  # 圆弧中点的角度（45/2度）
             text_radius = arc_radius * 1.2  # 文本放在圆弧内侧偏上位置
-            text_x = center_x + text_radius * math.cos(mid_angle_rad)
-            text_y = center_y - text_radius * math.sin(mid_angle_rad)  # 注意这里是减号，因为Qt坐标系Y轴向下
-            
-            # 调整文本位置，使其居中显示在计算出的位置
-            angle_text_width = angle_text_item.boundingRect().width()
-            angle_text_height = angle_text_item.boundingRect().height()
-            angle_text_item.setPos(
-                text_x - angle_text_width/2,
-                text_y - angle_text_height/2
-            )
-            
-            # 绘制坐标轴标签
-            font = QFont()
-            font.setPointSize(int(base_text_size * axis_label_scale))  # 转换为整数
-            
-            # X轴标签
-            x_label = self.addText("X")
-            x_label.setFont(font)
-            x_label.setDefaultTextColor(Qt.GlobalColor.black)
-            x_label.setPos(
-                center_x + axis_length + 10,  # 增加一点距离，避免与箭头重叠
-                center_y - x_label.boundingRect().height()/2
-            )
+            text_x = text_radius * math.cos(mid_angle_rad)
+            text_y = -text_radius * math.sin(mid_angle_rad)  # 注意这里是减号，因为Qt坐标系Y轴向下
+            angle_width = angle_metrics.horizontalAdvance(self._angle_text.text())
+            self._angle_text.setPos(text_x - angle_width/2, text_y - angle_metrics.height()/2)
             
-            # Y轴标签
-            y_label = self.addText("Y")
-            y_label.setFont(font)
-            y_label.setDefaultTextColor(Qt.GlobalColor.black)
-            y_label.setPos(
-                center_x - y_label.boundingRect().width()/2,
-                center_y - axis_length - y_label.boundingRect().height() - 10  # 增加一点距离，避免与箭头重叠
-            )
+            # 坐标轴标签，增加一点距离，避免与箭头重叠
+            axis_label_size = int(base_text_size * axis_label_scale)
+            self._x_label.set_static_text(*self._static_text("X", axis_label_size))
+            self._y_label.set_static_text(*self._static_text("Y", axis_label_size))
+            self._x_label.setPos(axis_length + 10, -self._x_label.size().height()/2)
+            y_size = self._y_label.size()
+            self._y_label.setPos(-y_size.width()/2, -axis_length - y_size.height() - 10)
             
             # 设置场景矩形
             scene_rect = QRectF(0, 0, view_width, view_height)
-            view.setSceneRect(scene_rect)
-            
+            if view.sceneRect() != scene_rect:
+                view.setSceneRect(scene_rect)
+                
+            self._preview_key = preview_key
             return True
             
         except Exception as e:
-            logger.error(f"绘制偏差预览失败: {e}", exc_info=True)
-            return False 
\ No newline at end of file
+            # 预览在视图缩放时频繁重绘，只在调试级别附带堆栈
+            logger.error("绘制偏差预览失败: %s", e, exc_info=logger.isEnabledFor(logging.DEBUG))
+            return False
+        finally:
+            if self.signalsBlocked():
+                self.blockSignals(False)
+                self.views()[0].viewport().update() 
\ No newline at end of file
@@ -4,38 +4,55 @@
 import os
 import sys
 from PyQt6.QtWidgets import QApplication
+from PyQt6.QtCore import QTimer
 from ui.main_window import MainWindow
 from utils.logger import get_logger
 
 # 创建模块的logger
 logger = get_logger(__name__)
 
+def _show_fatal_error(e: Exception):
+    """记录严重错误并弹出错误对话框
+    
+    Args:
+        e: 异常对象
+    """
+    # 记录异常信息及堆栈
+    logger.critical("程序发生严重错误: %s", e, exc_info=True)
+    
+    # 显示错误对话框
+    from PyQt6.QtWidgets import QMessageBox
+    error_msg = f"程序发生严重错误:\n{str(e)}\n\n详细错误信息已记录到日志文件。"
+    QMessageBox.critical(None, "错误", error_msg)
+
 def main():
     """主程序入口"""
     try:
         # 创建应用实例
         app = QApplication(sys.argv)
         
-        # 创建主窗口
-        window = MainWindow()
-        window.show()
+        # 主窗口在事件循环启动后创建，先让事件循环运行起来
+        windows = []
         
-        # 记录程序启动信息
-        logger.info("程序启动成功")
+        def boot():
+            try:
+                window = MainWindow()
+                window.show()
+                windows.append(window)  # 保持主窗口引用
+                
+                # 记录程序启动信息
+                logger.info("程序启动成功")
+            except Exception as e:
+                _show_fatal_error(e)
+                app.exit(1)
+                
+        QTimer.singleShot(0, boot)
         
         # 运行应用
         sys.exit(app.exec())
         
     except Exception as e:
-        # 记录异常信息
-        logger.critical(f"程序发生严重错误: {str(e)}")
-        logger.exception("详细错误信息:")
-        
-        # 显示错误对话框
-        from PyQt6.QtWidgets import QMessageBox
-        error_msg = f"程序发生严重错误:\n{str(e)}\n\n详细错误信息已记录到日志文件。"
-        QMessageBox.critical(None, "错误", error_msg)
-        
+        _show_fatal_error(e)
         sys.exit(1)
 
 if __name__ == "__main__":
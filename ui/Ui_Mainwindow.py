@@ -169,6 +169,9 @@ class Ui_MainWindow(object):
         self.distance_threshold = QtWidgets.QLineEdit(parent=self.match_points_group)
         self.distance_threshold.setObjectName("distance_threshold")
         self.match_filter_layout.addWidget(self.distance_threshold)
+        self.fast_match_check = QtWidgets.QCheckBox(parent=self.match_points_group)
+        self.fast_match_check.setObjectName("fast_match_check")
+        self.match_filter_layout.addWidget(self.fast_match_check)
         self.match_points_btn = QtWidgets.QPushButton(parent=self.match_points_group)
         self.match_points_btn.setObjectName("match_points_btn")
         self.match_filter_layout.addWidget(self.match_points_btn)
@@ -347,6 +350,8 @@ class Ui_MainWindow(object):
         self.point_number_radio.setText(_translate("MainWindow", "点位号"))
         self.distance_radio.setText(_translate("MainWindow", "距离"))
         self.distance_threshold_label.setText(_translate("MainWindow", "距离阈值（mm）："))
+        self.fast_match_check.setToolTip(_translate("MainWindow", "按距离匹配时使用最近点贪心匹配代替最优分配，点位较多时速度更快"))
+        self.fast_match_check.setText(_translate("MainWindow", "使用加速匹配"))
         self.match_points_btn.setText(_translate("MainWindow", "匹配点位"))
         self.draw_export_group.setTitle(_translate("MainWindow", "5、绘制偏差及数据导出"))
         self.statistics_btn.setText(_translate("MainWindow", "偏差数据统计"))
@@ -1,15 +1,36 @@
 """
 对话框模块
 """
+import re
+import time
 import tkinter as tk
 from tkinter import ttk, messagebox
 from typing import Optional, Dict, Any, Callable
-from utils.logger import logger
+from utils.logger import get_logger
 from config.settings import UI_CONFIG
 
+# 创建模块的logger
+logger = get_logger(__name__)
+
+# 完整的数值输入
+_NUM_RE = re.compile(r"^\s*[+-]?(?:\d+\.?\d*|\.\d+)\s*$")
+# 输入过程中允许的部分数值（如空串、"1."）
+_PARTIAL_NUM_RE = re.compile(r"^\d*\.?\d*$")
+
+# 参数设置对话框的参数名及其默认值在UI_CONFIG中的键
+_PARAMETER_DEFAULTS = {
+    'max_distance': 'default_max_distance',
+    'circle_radius': 'default_circle_radius',
+    'line_width': 'default_line_width',
+    'text_size': 'default_text_size'
+}
+
 class ProgressDialog:
     """进度对话框"""
     
+    # 界面刷新的最小间隔（毫秒），约30Hz
+    UPDATE_INTERVAL_MS = 33
+    
     def __init__(self, parent: tk.Tk, title: str = "处理中", message: str = "正在处理，请稍候..."):
         """
         初始化进度对话框
@@ -42,25 +63,56 @@ class ProgressDialog:
         )
         self.message_label.pack(pady=5)
         
+        # 待刷新的进度和消息，按固定间隔合并刷新
+        self._pending_value = None
+        self._pending_message = None
+        self._update_job = None
+        self._last_flush = 0.0
+        
         # 更新进度
         self.progress_var.set(0)
-        self.dialog.update()
+        self.dialog.update_idletasks()
         
     def update_progress(self, value: float, message: Optional[str] = None):
         """
         更新进度
         
+        距上次刷新不足UPDATE_INTERVAL_MS时只记录最新值，由定时回调统一刷新，
+        避免频繁调用时每次都重绘界面。
+        
         Args:
             value (float): 进度值(0-100)
             message (Optional[str]): 更新消息
         """
-        self.progress_var.set(value)
+        self._pending_value = value
         if message:
-            self.message_var.set(message)
-        self.dialog.update()
+            self._pending_message = message
+            
+        if (time.monotonic() - self._last_flush) * 1000 >= self.UPDATE_INTERVAL_MS:
+            # 同步调用方不会把控制权交还事件循环，到达刷新间隔时直接刷新
+            self._flush_update()
+        elif self._update_job is None:
+            self._update_job = self.dialog.after(self.UPDATE_INTERVAL_MS, self._flush_update)
+            
+    def _flush_update(self):
+        """将最新的进度和消息写入界面并重绘"""
+        if self._update_job is not None:
+            self.dialog.after_cancel(self._update_job)
+            self._update_job = None
+        if self._pending_value is not None:
+            self.progress_var.set(self._pending_value)
+            self._pending_value = None
+        if self._pending_message is not None:
+            self.message_var.set(self._pending_message)
+            self._pending_message = None
+        self.dialog.update_idletasks()
+        self._last_flush = time.monotonic()
         
     def close(self):
         """关闭对话框"""
+        if self._update_job is not None:
+            self.dialog.after_cancel(self._update_job)
+            self._update_job = None
         self.dialog.destroy()
 
 class ParameterDialog:
@@ -70,50 +122,94 @@ class ParameterDialog:
         """
         初始化参数设置对话框
         
+        只记录父窗口和标题，窗口控件在首次调用show()时创建，此前get_parameters()返回默认参数；
+        关闭时隐藏窗口而不销毁，再次打开时保留用户上次输入的值。
+        
         Args:
             parent (tk.Tk): 父窗口
             title (str): 对话框标题
         """
-        self.dialog = tk.Toplevel(parent)
-        self.dialog.title(title)
+        self.parent = parent
+        self.title = title
+        self.dialog = None
+        self.main_frame = None
+        
+        # 参数变量
+        self.parameters = {}
+        # 解析得到的参数值缓存，任一参数被修改后失效
+        self._parsed = None
+        self._built = False
+        
+    def _build(self):
+        """创建对话框窗口及控件"""
+        self.dialog = tk.Toplevel(self.parent)
+        self.dialog.title(self.title)
         self.dialog.geometry("400x300")
-        self.dialog.transient(parent)
-        self.dialog.grab_set()
+        self.dialog.transient(self.parent)
+        # 关闭窗口按取消处理，只隐藏窗口
+        self.dialog.protocol("WM_DELETE_WINDOW", self._on_cancel)
         
         # 创建主框架
         self.main_frame = ttk.Frame(self.dialog, padding="10")
         self.main_frame.pack(fill=tk.BOTH, expand=True)
         
-        # 参数变量
-        self.parameters = {}
+        # 输入校验：只允许键入数字和小数点
+        self._validate_cmd = (self.dialog.register(self._validate_input), '%P')
         
         # 创建参数输入区域
         self._create_parameter_section()
         
         # 创建按钮区域
         self._create_button_section()
+        self._built = True
+        self._parsed = None
+        
+    def show(self):
+        """显示对话框，首次显示时创建控件"""
+        if not self._built:
+            self._build()
+        else:
+            self.dialog.deiconify()
+        self.dialog.grab_set()
+        
+    def _close(self):
+        """隐藏对话框，保留控件供下次显示"""
+        self.dialog.grab_release()
+        self.dialog.withdraw()
         
     def _create_parameter_section(self):
         """创建参数输入区域"""
         # 最大偏差设置
         ttk.Label(self.main_frame, text="最大偏差:").grid(row=0, column=0, sticky=tk.W)
         self.parameters['max_distance'] = tk.StringVar(value=str(UI_CONFIG['default_max_distance']))
-        ttk.Entry(self.main_frame, textvariable=self.parameters['max_distance'], width=10).grid(row=0, column=1, sticky=tk.W, padx=5)
+        ttk.Entry(self.main_frame, textvariable=self.parameters['max_distance'], width=10,
+                  validate='key', validatecommand=self._validate_cmd).grid(row=0, column=1, sticky=tk.W, padx=5)
         
         # 圆形半径设置
         ttk.Label(self.main_frame, text="圆形半径:").grid(row=1, column=0, sticky=tk.W)
         self.parameters['circle_radius'] = tk.StringVar(value=str(UI_CONFIG['default_circle_radius']))
-        ttk.Entry(self.main_frame, textvariable=self.parameters['circle_radius'], width=10).grid(row=1, column=1, sticky=tk.W, padx=5)
+        ttk.Entry(self.main_frame, textvariable=self.parameters['circle_radius'], width=10,
+                  validate='key', validatecommand=self._validate_cmd).grid(row=1, column=1, sticky=tk.W, padx=5)
         
         # 线宽设置
         ttk.Label(self.main_frame, text="线宽:").grid(row=2, column=0, sticky=tk.W)
         self.parameters['line_width'] = tk.StringVar(value=str(UI_CONFIG['default_line_width']))
-        ttk.Entry(self.main_frame, textvariable=self.parameters['line_width'], width=10).grid(row=2, column=1, sticky=tk.W, padx=5)
+        ttk.Entry(self.main_frame, textvariable=self.parameters['line_width'], width=10,
+                  validate='key', validatecommand=self._validate_cmd).grid(row=2, column=1, sticky=tk.W, padx=5)
         
         # 文字大小设置
         ttk.Label(self.main_frame, text="文字大小:").grid(row=3, column=0, sticky=tk.W)
         self.parameters['text_size'] = tk.StringVar(value=str(UI_CONFIG['default_text_size']))
-        ttk.Entry(self.main_frame, textvariable=self.parameters['text_size'], width=10).grid(row=3, column=1, sticky=tk.W, padx=5)
+        ttk.Entry(self.main_frame, textvariable=self.parameters['text_size'], width=10,
+                  validate='key', validatecommand=self._validate_cmd).grid(row=3, column=1, sticky=tk.W, padx=5)
+        
+        # 任一参数被修改时使解析缓存失效
+        for var in self.parameters.values():
+            var.trace_add("write", self._invalidate_parsed)
+            
+    def _invalidate_parsed(self, *args):
+        """参数变量写入回调，清除解析缓存"""
+        self._parsed = None
         
     def _create_button_section(self):
         """创建按钮区域"""
@@ -123,21 +219,50 @@ class ParameterDialog:
         ttk.Button(button_frame, text="确定", command=self._on_ok).pack(side=tk.LEFT, padx=5)
         ttk.Button(button_frame, text="取消", command=self._on_cancel).pack(side=tk.LEFT, padx=5)
         
+    @staticmethod
+    def _validate_input(text: str) -> bool:
+        """输入框按键校验回调
+        
+        Args:
+            text: 按键生效后输入框的内容
+            
+        Returns:
+            bool: 是否接受此次输入
+        """
+        return _PARTIAL_NUM_RE.match(text) is not None
+    
+    def _parse_parameters(self) -> Dict[str, float]:
+        """解析并验证所有参数
+        
+        Returns:
+            Dict[str, float]: 参数值字典
+            
+        Raises:
+            ValueError: 参数不是数字或不大于0
+        """
+        parsed = {}
+        for name, var in self.parameters.items():
+            text = var.get()
+            if not _NUM_RE.match(text):
+                raise ValueError(f"{name}必须为数字")
+            value = float(text)
+            if value <= 0:
+                raise ValueError(f"{name}必须大于0")
+            parsed[name] = value
+        return parsed
+    
     def _on_ok(self):
         """确定按钮回调"""
         try:
-            # 验证参数
-            for name, var in self.parameters.items():
-                value = float(var.get())
-                if value <= 0:
-                    raise ValueError(f"{name}必须大于0")
-            self.dialog.destroy()
+            # 验证参数，解析结果缓存供get_parameters直接返回
+            self._parsed = self._parse_parameters()
+            self._close()
         except ValueError as e:
-            messagebox.showerror("错误", str(e))
+            _show_message("error", self.dialog, "错误", str(e))
             
     def _on_cancel(self):
         """取消按钮回调"""
-        self.dialog.destroy()
+        self._close()
         
     def get_parameters(self) -> Dict[str, float]:
         """
@@ -146,7 +271,52 @@ class ParameterDialog:
         Returns:
             Dict[str, float]: 参数值字典
         """
-        return {name: float(var.get()) for name, var in self.parameters.items()}
+        if self._parsed is None:
+            if self._built:
+                self._parsed = {name: float(var.get()) for name, var in self.parameters.items()}
+            else:
+                # 对话框尚未显示过时返回默认参数
+                self._parsed = {name: float(UI_CONFIG[key]) for name, key in _PARAMETER_DEFAULTS.items()}
+        return dict(self._parsed)
+
+_parameter_dialog: Optional[ParameterDialog] = None
+
+def get_parameter_dialog(parent: tk.Tk) -> ParameterDialog:
+    """获取共用的参数设置对话框实例
+    
+    Args:
+        parent (tk.Tk): 父窗口
+        
+    Returns:
+        ParameterDialog: 参数设置对话框
+    """
+    global _parameter_dialog
+    if _parameter_dialog is None or _parameter_dialog.parent is not parent:
+        _parameter_dialog = ParameterDialog(parent)
+    return _parameter_dialog
+
+def _message_parent(parent: Optional[tk.Misc]) -> Optional[tk.Misc]:
+    """获取提示框的父窗口，未指定时使用默认根窗口，不另建Tk实例
+    
+    Args:
+        parent: 调用方指定的父窗口
+        
+    Returns:
+        Optional[tk.Misc]: 提示框父窗口
+    """
+    return parent if parent is not None else tk._default_root
+
+def _show_message(kind: str, parent: Optional[tk.Misc], title: str, message: str):
+    """显示提示框
+    
+    Args:
+        kind: 提示框类型，"error"或"info"
+        parent: 父窗口
+        title: 标题
+        message: 消息
+    """
+    show = messagebox.showerror if kind == "error" else messagebox.showinfo
+    show(title, message, parent=_message_parent(parent))
 
 class ConfirmationDialog:
     """确认对话框"""
@@ -164,7 +334,7 @@ class ConfirmationDialog:
         Returns:
             bool: 是否确认
         """
-        return messagebox.askyesno(title, message)
+        return messagebox.askyesno(title, message, parent=_message_parent(parent))
 
 class ErrorDialog:
     """错误对话框"""
@@ -179,7 +349,7 @@ class ErrorDialog:
             title (str): 对话框标题
             message (str): 错误消息
         """
-        messagebox.showerror(title, message)
+        _show_message("error", parent, title, message)
         logger.error(message)
 
 class InfoDialog:
@@ -195,5 +365,5 @@ class InfoDialog:
             title (str): 对话框标题
             message (str): 提示消息
         """
-        messagebox.showinfo(title, message)
-        logger.info(message) 
\ No newline at end of file
+        _show_message("info", parent, title, message)
+        logger.info(message)
\ No newline at end of file
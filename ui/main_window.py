@@ -3,24 +3,75 @@
 """
 import os
 import sys
+import logging
+from datetime import datetime
 from PyQt6.QtWidgets import (
     QMainWindow, QFileDialog, QMessageBox, QGraphicsScene, 
     QGraphicsView
 )
-from PyQt6.QtCore import Qt
-from PyQt6.QtGui import QPainter
+from PyQt6.QtCore import Qt, QObject, QTimer, QThreadPool, QLocale, QStringListModel, pyqtSignal
+from PyQt6.QtGui import QPainter, QTextCursor, QDoubleValidator
 from .Ui_Mainwindow import Ui_MainWindow
+from .workers import Worker, create_com_pool
 from core.cad_handler import CADHandler
 from core.data_processor import DataProcessor
 from core.visualizer import Visualizer, PreviewScene
 from utils.logger import get_logger
+from utils.com_utils import cast_entity
 
 # 创建模块的logger
 logger = get_logger(__name__)
 
+class _LogPanelBridge(QObject):
+    """日志记录转发信号，跨线程发出时由Qt排队到主线程执行"""
+    record = pyqtSignal(float, int, str)
+
+class _LogPanelHandler(logging.Handler):
+    """将日志记录显示到主窗口日志控件的处理器
+    
+    可在任意线程中记录日志，记录通过信号转发到主线程后再写入控件。
+    """
+    
+    def __init__(self, slot):
+        """初始化处理器
+        
+        Args:
+            slot: 接收(创建时间戳, 日志级别, 日志消息)的槽函数
+        """
+        super().__init__(logging.INFO)
+        self.bridge = _LogPanelBridge()
+        self.bridge.record.connect(slot)
+        
+    def emit(self, record):
+        """转发日志记录"""
+        try:
+            self.bridge.record.emit(record.created, record.levelno, record.getMessage())
+        except Exception:
+            self.handleError(record)
+            
 class MainWindow(QMainWindow):
     """主窗口类"""
     
+    # 日志控件中各级别消息的(前缀, 颜色)
+    _LOG_STYLES = {
+        logging.INFO: ("信息", "black"),
+        logging.WARNING: ("警告", "orange"),
+        logging.ERROR: ("错误", "red"),
+        logging.CRITICAL: ("错误", "red"),
+    }
+    # 日志控件中每条消息的HTML模板
+    _LOG_FMT = '<div style="color: {c}">[{t}] [{p}] {m}</div>'
+    
+    # 样式参数：(保存解析结果的属性名, 输入框名称)
+    _STYLE_FIELDS = (
+        ("_pile_diameter", "circle_diameter_edit"),
+        ("_axis_scale", "axis_scale_edit"),
+        ("_arrow_scale", "arrow_scale_edit"),
+        ("_main_text_scale", "main_text_scale_edit"),
+        ("_axis_label_scale", "axis_label_scale_edit"),
+        ("_angle_text_scale", "angle_text_scale_edit"),
+    )
+    
     def __init__(self):
         """初始化主窗口"""
         super().__init__()
@@ -52,6 +103,47 @@ class MainWindow(QMainWindow):
         self.design_points = []
         self.measured_points = []
         
+        # 各用途文件对话框上次所在的目录 {用途: 目录}
+        self._last_dir = {}
+        
+        # 图层列表模型
+        self._layer_model = QStringListModel(self)
+        
+        # 后台任务：CAD操作在单独的CAD线程中执行，CAD处理器的COM对象只在该线程中使用
+        self._com_pool = create_com_pool()
+        self._workers = set()
+        self._last_progress = -1
+        
+        # 样式参数在输入框文本变化时解析一次，无效或为空时为None
+        for attr, _ in self._STYLE_FIELDS:
+            setattr(self, attr, None)
+            
+        # 样式应用：短时间内的多次请求合并为一次，参数未变化时跳过
+        self._last_style = None
+        self._style_timer = QTimer(self)
+        self._style_timer.setSingleShot(True)
+        self._style_timer.timeout.connect(self._do_apply_style)
+        
+        # 匹配点对数组缓存 ((设计坐标数组, 实测坐标数组), 匹配点对数组)
+        self._matched_cache = None
+        
+        # 上次成功绘制偏差时的参数指纹
+        self._last_draw_fp = None
+        self._pending_draw_fp = None
+        
+        # 日志输出：消息先进入队列，每33毫秒最多写入日志控件一次
+        self._log_cursor = QTextCursor(self.ui.log_text.document())
+        self._pending_logs = []
+        self._log_timer = QTimer(self)
+        self._log_timer.setSingleShot(True)
+        self._log_timer.setInterval(33)
+        self._log_timer.timeout.connect(self._flush_log)
+        
+        # 界面日志：记录到该logger的消息显示在日志控件中，同时照常写入日志文件和控制台
+        self._logger = logger.getChild("panel")
+        self._log_handler = _LogPanelHandler(self._append_log)
+        self._logger.addHandler(self._log_handler)
+        
         # 连接信号和槽
         self.connect_signals()
         
@@ -88,6 +180,11 @@ class MainWindow(QMainWindow):
         # 样式设置
         self.ui.reset_style_btn.clicked.connect(self.reset_style)
         self.ui.apply_style_btn.clicked.connect(self.apply_style)
+        # 样式输入框编辑完成后自动刷新预览（apply_style延迟执行，连续编辑只刷新一次）
+        for attr, edit_name in self._STYLE_FIELDS:
+            edit = getattr(self.ui, edit_name)
+            edit.textChanged.connect(lambda text, attr=attr: self._on_style_text_changed(attr, text))
+            edit.editingFinished.connect(self.apply_style)
         
     def init_ui_state(self):
         """初始化UI状态"""
@@ -99,6 +196,15 @@ class MainWindow(QMainWindow):
         self.ui.angle_text_scale_edit.setText("1.0")    # 角度文本比例
         self.ui.arrow_scale_edit.setText("1.0")        # 箭头比例
         
+        # 样式参数只允许输入正数（使用C区域设置，小数点固定为"."）
+        validator = QDoubleValidator(0.001, 1e6, 6, self)
+        validator.setNotation(QDoubleValidator.Notation.StandardNotation)
+        locale = QLocale.c()
+        locale.setNumberOptions(QLocale.NumberOption.RejectGroupSeparator)
+        validator.setLocale(locale)
+        for _, edit_name in self._STYLE_FIELDS:
+            getattr(self.ui, edit_name).setValidator(validator)
+            
         # 设置箭头比例编辑框提示信息
         #self.ui.arrow_scale_edit.setPlaceholderText("可手动调整")
         
@@ -106,32 +212,53 @@ class MainWindow(QMainWindow):
         self.ui.circle_diameter_edit.setPlaceholderText("可手动调整")
         self.ui.circle_count_edit.setReadOnly(True)
         
+        # 图层下拉列表使用字符串列表模型
+        self.ui.layer_combo.setModel(self._layer_model)
+        
         # 设置单选按钮默认状态
         self.ui.point_number_radio.setChecked(True)
         
         # 初始化进度条
-        self.ui.progressBar.setValue(0)
+        self._set_progress(0)
         self.ui.progressBar.setVisible(False)  # 默认隐藏进度条
         
         # 设置预览视图
         self.ui.preview_view.setRenderHint(QPainter.RenderHint.Antialiasing)  # 抗锯齿
-        self.ui.preview_view.setViewportUpdateMode(QGraphicsView.ViewportUpdateMode.FullViewportUpdate)
+        self.ui.preview_view.setViewportUpdateMode(QGraphicsView.ViewportUpdateMode.SmartViewportUpdate)  # 只重绘脏区域
+        self.ui.preview_view.setCacheMode(QGraphicsView.CacheModeFlag.CacheBackground)  # 缓存背景，重绘时直接贴图
         self.ui.preview_view.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
         self.ui.preview_view.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
         self.ui.preview_view.setMinimumSize(400, 300)  # 设置最小尺寸
         
-        # 立即显示默认样式预览
+        # 显示默认样式预览（apply_style经定时器延迟到事件循环中执行，不阻塞初始化）
         self.apply_style()
         
         # 记录初始化完成
-        self.log_message("程序初始化完成")
+        self._logger.info("程序初始化完成")
+        
+    def _choose_file(self, save, role, caption, file_filter):
+        """弹出文件对话框，初始目录为同一用途上次选择的文件所在目录
+        
+        Args:
+            save: 是否为保存文件对话框
+            role: 文件用途，如"cad"、"measured"
+            caption: 对话框标题
+            file_filter: 文件类型过滤器
+            
+        Returns:
+            str: 选择的文件路径，取消时为空字符串
+        """
+        dialog = QFileDialog.getSaveFileName if save else QFileDialog.getOpenFileName
+        file_path, _ = dialog(self, caption, self._last_dir.get(role, ""), file_filter)
+        if file_path:
+            self._last_dir[role] = os.path.dirname(file_path)
+        return file_path
         
     def browse_cad_file(self):
         """浏览CAD文件"""
-        file_path, _ = QFileDialog.getOpenFileName(
-            self,
+        file_path = self._choose_file(
+            False, "cad",
             "选择CAD文件",
-            "",
             "CAD文件 (*.dwg *.dxf);;所有文件 (*.*)"
         )
         if file_path:
@@ -144,55 +271,51 @@ class MainWindow(QMainWindow):
             QMessageBox.warning(self, "警告", "请先选择CAD文件！")
             return
             
-        try:
-            # 初始化进度条
-            self.ui.progressBar.setValue(0)
-            self.ui.progressBar.setVisible(True)
+        self._logger.info("正在初始化CAD应用程序，请稍候...")
+        self._start_task(self._open_cad_job, self._on_cad_opened, "打开CAD文件失败", file_path, com=True)
+        
+    def _open_cad_job(self, report, file_path):
+        """打开CAD文件并读取图层列表（在CAD线程中执行）
+        
+        Args:
+            report: 进度回调
+            file_path: CAD文件路径
             
-            # 确保CAD应用程序已初始化
-            self.log_message("正在初始化CAD应用程序，请稍候...")
-            if not self.cad_handler.ensure_com_initialized():
-                self.log_message("CAD应用程序初始化失败", "ERROR")
-                QMessageBox.critical(self, "错误", "CAD应用程序初始化失败")
-                self.ui.progressBar.setVisible(False)
-                return
-                
-            self.ui.progressBar.setValue(50)
+        Returns:
+            Tuple[bool, str, str, List[str]]: (是否成功, 错误信息, 文件路径, 图层列表)
+        """
+        if not self.cad_handler.ensure_com_initialized():
+            return False, "CAD应用程序初始化失败", file_path, []
             
-            # 打开CAD文件
-            self.log_message(f"正在打开CAD文件：{file_path}")
-            success, msg = self.cad_handler.open_drawing(file_path)
-            if success:
-                self.cad_file = file_path
-                self.log_message(f"成功打开CAD文件：{file_path}")
-                
-                self.ui.progressBar.setValue(80)
-                
-                # 刷新图层列表
-                self.log_message("正在刷新图层列表，请稍候...")
-                self.refresh_layers()
-                
-                self.ui.progressBar.setValue(100)
-            else:
-                self.log_message(f"打开CAD文件失败：{msg}", "ERROR")
-                QMessageBox.critical(self, "错误", msg)
-                
-            # 完成后隐藏进度条
-            self.ui.progressBar.setVisible(False)
-                
-        except Exception as e:
-            error_msg = f"打开CAD文件失败：{str(e)}"
-            self.log_message(error_msg, "ERROR")
-            QMessageBox.critical(self, "错误", error_msg)
-            # 发生错误时隐藏进度条
-            self.ui.progressBar.setVisible(False)
+        report(50, f"正在打开CAD文件：{file_path}")
+        success, msg = self.cad_handler.open_drawing(file_path)
+        if not success:
+            return False, msg, file_path, []
+            
+        report(80, "正在刷新图层列表，请稍候...")
+        return True, msg, file_path, self.cad_handler.get_layer_names()
+        
+    def _on_cad_opened(self, result):
+        """CAD文件打开完成
+        
+        Args:
+            result: _open_cad_job的返回值
+        """
+        success, msg, file_path, layers = result
+        if success:
+            self.cad_file = file_path
+            self._last_draw_fp = None
+            self._logger.info(f"成功打开CAD文件：{file_path}")
+            self._set_layers(layers)
+        else:
+            self._logger.error(f"打开CAD文件失败：{msg}")
+            QMessageBox.critical(self, "错误", msg)
             
     def browse_measured_file(self):
         """浏览实测数据文件"""
-        file_path, _ = QFileDialog.getOpenFileName(
-            self,
+        file_path = self._choose_file(
+            False, "measured",
             "选择实测数据文件",
-            "",
             "文本文件 (*.txt *.csv);;所有文件 (*.*)"
         )
         if file_path:
@@ -204,100 +327,123 @@ class MainWindow(QMainWindow):
             QMessageBox.warning(self, "警告", "请先打开CAD文件！")
             return
             
-        try:
-            layers = self.cad_handler.get_layer_names()
-            self.ui.layer_combo.clear()
-            self.ui.layer_combo.addItems(layers)
-            if layers:
-                self.ui.layer_combo.setCurrentIndex(0)
-            self.log_message("刷新图层列表")
-        except Exception as e:
-            logger.error(f"刷新图层失败: {e}")
-            QMessageBox.critical(self, "错误", f"刷新图层失败：{str(e)}")
-            
+        self._start_task(lambda report: self.cad_handler.get_layer_names(),
+                         self._set_layers, "刷新图层失败", com=True)
+        
+    def _set_layers(self, layers):
+        """更新图层下拉列表
+        
+        Args:
+            layers: 图层名称列表
+        """
+        # 整体替换模型数据，只触发一次模型重置
+        self._layer_model.setStringList(layers)
+        self.ui.layer_combo.setCurrentIndex(0 if layers else -1)
+        self._logger.info("刷新图层列表")
+        
     def select_circle(self):
         """选择桩基圆"""
         if not self.cad_file:
             QMessageBox.warning(self, "警告", "请先打开CAD文件！")
             return
             
-        try:
-            # 初始化进度条
-            self.ui.progressBar.setValue(0)
-            self.ui.progressBar.setVisible(True)
-            
-            # 提示用户选择桩基圆
-            self.log_message("请在CAD图纸中选择一个桩基圆...")
-            entities = self.cad_handler.get_selected_entities()
-            
-            if not entities:
-                self.log_message("未选择任何实体", "WARNING")
-                QMessageBox.warning(self, "警告", "未选择任何实体！")
-                self.ui.progressBar.setVisible(False)
-                return
-                
-            self.ui.progressBar.setValue(30)
+        # 提示用户选择桩基圆
+        self._logger.info("请在CAD图纸中选择一个桩基圆...")
+        self._start_task(self._select_circle_job, self._on_circle_selected, "选择桩基圆失败", com=True)
+        
+    def _select_circle_job(self, report):
+        """等待用户选择桩基圆，查找相似圆并提取圆心坐标（在CAD线程中执行）
+        
+        Args:
+            report: 进度回调
             
-            # 查找相似圆
-            self.log_message("正在查找相似桩基圆...")
-            circles = self.cad_handler.find_similar_circles(entities[0])
+        Returns:
+            Optional[Dict[str, Any]]: 相似圆数量、参考圆直径和圆心坐标，未选择实体时返回None
+        """
+        entities = self.cad_handler.get_selected_entities()
+        if not entities:
+            return None
+            
+        # 查找相似圆
+        report(30, "正在查找相似桩基圆...")
+        circles = self.cad_handler.find_similar_circles(entities[0])
+        report(60)
+        if not circles:
+            return {'count': 0}
+            
+        report(None, f"找到 {len(circles)} 个相似桩基圆")
+        diameter = None
+        if entities[0].ObjectName == 'AcDbCircle':
+            diameter = cast_entity(entities[0], "IAcadCircle").Radius * 2
+            
+        # 提取圆心坐标
+        report(None, "正在提取圆心坐标...")
+        points = self.cad_handler.extract_points_from_circles(circles, as_array=True)
+        
+        # 高亮显示
+        report(80, "正在高亮显示相似桩基圆...")
+        self.cad_handler.highlight_entities(circles)
+        return {'count': len(circles), 'diameter': diameter, 'points': points}
+        
+    def _on_circle_selected(self, result):
+        """桩基圆选择完成
+        
+        Args:
+            result: _select_circle_job的返回值
+        """
+        if result is None:
+            self._logger.warning("未选择任何实体")
+            QMessageBox.warning(self, "警告", "未选择任何实体！")
+            return
+        if not result['count']:
+            self._logger.warning("未找到相似桩基圆")
+            QMessageBox.warning(self, "警告", "未找到相似桩基圆")
+            return
             
-            self.ui.progressBar.setValue(60)
+        # 更新圆信息显示
+        self._show_circle_info(result['count'], result['diameter'])
             
-            if circles:
-                self.log_message(f"找到 {len(circles)} 个相似桩基圆")
-                
-                # 更新圆信息显示
-                self.ui.circle_count_edit.setText(str(len(circles)))
-                if hasattr(entities[0], 'Radius'):
-                    diameter = entities[0].Radius * 2
-                    self.ui.circle_diameter_edit.setText(f"{diameter:.2f}")
-                
-                # 提取圆心坐标
-                self.log_message("正在提取圆心坐标...")
-                points = self.cad_handler.extract_points_from_circles(circles)
-                
-                self.ui.progressBar.setValue(80)
-                
-                # 高亮显示
-                self.log_message("正在高亮显示相似桩基圆...")
-                self.cad_handler.highlight_entities(circles)
-                
-                # 保存为设计点位
-                self.design_points = points
-                self.log_message(f"已保存 {len(points)} 个设计点位")
-                
-                # 弹出文件选择对话框
-                file_path, _ = QFileDialog.getSaveFileName(
-                    self,
-                    "导出CASS格式文件",
-                    "",
-                    "CASS文件 (*.dat);;所有文件 (*.*)"
-                )
-                
-                if file_path:
-                    # 导出为CASS格式
-                    success = self.cad_handler.export_cass_format(points, file_path)
-                    if success:
-                        self.log_message(f"成功导出CASS格式文件：{file_path}")
-                        QMessageBox.information(self, "成功", "已成功导出CASS格式文件！")
-                    else:
-                        self.log_message("导出CASS格式失败", "ERROR")
-                        QMessageBox.warning(self, "警告", "导出CASS格式失败")
+        # 保存为设计点位
+        points = result['points']
+        self.design_points = points
+        self._logger.info(f"已保存 {len(points)} 个设计点位")
+        
+        # 弹出文件选择对话框
+        file_path = self._choose_file(
+            True, "cass_save",
+            "导出CASS格式文件",
+            "CASS文件 (*.dat);;所有文件 (*.*)"
+        )
+        
+        if file_path:
+            # 导出为CASS格式
+            success = self.cad_handler.export_cass_format(points, file_path)
+            if success:
+                self._logger.info(f"成功导出CASS格式文件：{file_path}")
+                self._notify("已成功导出CASS格式文件")
             else:
-                self.log_message("未找到相似桩基圆", "WARNING")
-                QMessageBox.warning(self, "警告", "未找到相似桩基圆")
-            
-            # 完成后隐藏进度条
-            self.ui.progressBar.setValue(100)
-            self.ui.progressBar.setVisible(False)
+                self._logger.error("导出CASS格式失败")
+                QMessageBox.warning(self, "警告", "导出CASS格式失败")
                 
-        except Exception as e:
-            error_msg = f"选择桩基圆失败：{str(e)}"
-            self.log_message(error_msg, "ERROR")
-            QMessageBox.critical(self, "错误", error_msg)
-            # 发生错误时隐藏进度条
-            self.ui.progressBar.setVisible(False)
+    def _notify(self, message, timeout=3000):
+        """在状态栏显示操作成功的提示，超时后自动消失，不打断后续操作
+        
+        Args:
+            message: 提示信息
+            timeout: 显示时长（毫秒）
+        """
+        self.ui.statusbar.showMessage(message, timeout)
+        
+    def _show_circle_info(self, count, diameter=None):
+        """更新桩基圆数量和直径显示
+        
+        Args:
+            count: 桩基圆数量
+            diameter: 桩基圆直径，为None时不更新
+        """
+        self.ui.circle_count_edit.setText(str(count))
+        if diameter is not None:
+            self.ui.circle_diameter_edit.setText(f"{diameter:.2f}")
             
     def extract_cass(self):
         """提取为Cass格式"""
@@ -310,244 +456,362 @@ class MainWindow(QMainWindow):
             QMessageBox.warning(self, "警告", "请先选择图层！")
             return
             
-        try:
-            # 初始化进度条
-            self.ui.progressBar.setValue(0)
-            self.ui.progressBar.setVisible(True)
-            
-            # 选择桩基圆
-            self.log_message(f"正在图层 {layer} 中查找桩基圆...")
-            circles = self.cad_handler.select_circles(layer)
-            if not circles:
-                self.log_message(f"当前图层 {layer} 未找到桩基圆", "WARNING")
-                QMessageBox.warning(self, "警告", "当前图层未找到桩基圆！")
-                self.ui.progressBar.setVisible(False)
-                return
-                
-            self.ui.progressBar.setValue(40)
-            self.log_message(f"在图层 {layer} 中找到 {len(circles)} 个桩基圆")
-            
-            # 分析圆的信息
-            stats = self.cad_handler.analyze_circles(layer)
-            if stats:
-                # 更新UI显示
-                self.ui.circle_count_edit.setText(str(stats['count']))
-                if 'avg_radius' in stats:
-                    diameter = stats['avg_radius'] * 2
-                    self.ui.circle_diameter_edit.setText(f"{diameter:.2f}")
-            
-            # 提取圆心坐标
-            self.log_message("正在提取圆心坐标...")
-            points = self.cad_handler.extract_points_from_circles(circles)
-            if not points:
-                self.log_message("提取圆心坐标失败", "ERROR")
-                QMessageBox.warning(self, "警告", "提取圆心坐标失败！")
-                self.ui.progressBar.setVisible(False)
-                return
-                
-            self.ui.progressBar.setValue(70)
-            self.log_message(f"成功提取 {len(points)} 个圆心坐标")
-            
-            # 高亮显示选中的圆
-            self.log_message("正在高亮显示选中的圆...")
-            self.cad_handler.highlight_entities(circles, highlight=True, color=1)
+        self._logger.info(f"正在图层 {layer} 中查找桩基圆...")
+        self._start_task(self._extract_cass_job, self._on_cass_extracted, "导出CASS格式失败", layer, com=True)
+        
+    def _extract_cass_job(self, report, layer):
+        """查找图层中的桩基圆并提取圆心坐标（在CAD线程中执行）
+        
+        Args:
+            report: 进度回调
+            layer: 图层名称
             
-            self.ui.progressBar.setValue(80)
+        Returns:
+            Dict[str, Any]: 图层名称、桩基圆数量、统计信息和圆心坐标
+        """
+        circles = self.cad_handler.select_circles(layer)
+        if not circles:
+            return {'layer': layer, 'count': 0}
             
-            # 保存为Cass格式
-            file_path, _ = QFileDialog.getSaveFileName(
-                self,
-                "保存Cass格式文件",
-                "",
-                "Cass文件 (*.dat);;所有文件 (*.*)"
-            )
+        report(40, f"在图层 {layer} 中找到 {len(circles)} 个桩基圆")
+        
+        # 一次遍历读取圆心坐标和直径，统计信息直接由结果计算
+        report(None, "正在提取圆心坐标...")
+        geometry = self.cad_handler.extract_circle_geometry(circles)
+        points = geometry[:, :2]
+        stats = {'count': len(circles), 'avg_radius': float(geometry[:, 2].mean()) / 2} if len(geometry) else {}
+        if len(points) == 0:
+            return {'layer': layer, 'count': len(circles), 'stats': stats, 'points': points}
+            
+        report(70, f"成功提取 {len(points)} 个圆心坐标")
+        
+        # 高亮显示选中的圆
+        report(None, "正在高亮显示选中的圆...")
+        self.cad_handler.highlight_entities(circles, highlight=True, color=1)
+        report(80)
+        return {'layer': layer, 'count': len(circles), 'stats': stats, 'points': points}
+        
+    def _on_cass_extracted(self, result):
+        """图层桩基圆提取完成
+        
+        Args:
+            result: _extract_cass_job的返回值
+        """
+        if not result['count']:
+            self._logger.warning(f"当前图层 {result['layer']} 未找到桩基圆")
+            QMessageBox.warning(self, "警告", "当前图层未找到桩基圆！")
+            return
             
-            if file_path:
-                self.log_message(f"正在导出CASS格式文件：{file_path}")
-                success = self.cad_handler.export_cass_format(points, file_path)
-                if success:
-                    self.log_message(f"成功导出CASS格式文件：{file_path}")
-                    QMessageBox.information(self, "成功", "已成功导出CASS格式文件！")
-                else:
-                    self.log_message("导出CASS格式失败", "ERROR")
-                    QMessageBox.warning(self, "警告", "导出CASS格式失败")
-            
-            # 完成后隐藏进度条
-            self.ui.progressBar.setValue(100)
-            self.ui.progressBar.setVisible(False)
+        stats = result['stats']
+        if stats:
+            # 更新UI显示
+            self._show_circle_info(stats['count'], stats['avg_radius'] * 2 if 'avg_radius' in stats else None)
                 
-        except Exception as e:
-            error_msg = f"导出CASS格式失败：{str(e)}"
-            self.log_message(error_msg, "ERROR")
-            QMessageBox.critical(self, "错误", error_msg)
-            # 发生错误时隐藏进度条
-            self.ui.progressBar.setVisible(False)
+        points = result['points']
+        if len(points) == 0:
+            self._logger.error("提取圆心坐标失败")
+            QMessageBox.warning(self, "警告", "提取圆心坐标失败！")
+            return
             
+        # 保存为Cass格式
+        file_path = self._choose_file(
+            True, "cass_save",
+            "保存Cass格式文件",
+            "Cass文件 (*.dat);;所有文件 (*.*)"
+        )
+        
+        if file_path:
+            self._logger.info(f"正在导出CASS格式文件：{file_path}")
+            success = self.cad_handler.export_cass_format(points, file_path)
+            if success:
+                self._logger.info(f"成功导出CASS格式文件：{file_path}")
+                self._notify("已成功导出CASS格式文件")
+            else:
+                self._logger.error("导出CASS格式失败")
+                QMessageBox.warning(self, "警告", "导出CASS格式失败")
+                
     def load_measured_data(self):
         """加载实测数据"""
         # 检查是否选择了文件
         file_path = self.ui.measured_data_path.text()
         if not file_path:
-            self.log_message("未选择实测数据文件", "WARNING")
+            self._logger.warning("未选择实测数据文件")
             QMessageBox.warning(self, "警告", "请先选择实测数据文件！")
             return
             
-        try:
-            # 初始化进度条
-            self.ui.progressBar.setValue(0)
-            self.ui.progressBar.setVisible(True)
-            
-            # 根据选择的格式加载数据
-            if self.ui.cass_format_radio.isChecked():
-                # CASS格式
-                self.log_message(f"正在加载CASS格式文件：{file_path}")
-                success, msg = self.data_processor.load_cass_data(file_path, is_design=False)
-            else:
-                # 自定义格式
-                column_format = self.ui.column_format_edit.text()
-                if not column_format:
-                    self.log_message("未指定自定义格式的列定义", "WARNING")
-                    QMessageBox.warning(self, "警告", "请先在列定义框中指定数据格式！")
-                    self.ui.progressBar.setVisible(False)
+        # 根据选择的格式加载数据
+        if self.ui.cass_format_radio.isChecked():
+            # CASS格式
+            self._logger.info(f"正在加载CASS格式文件：{file_path}")
+            job = lambda report: self.data_processor.load_cass_data(file_path, is_design=False)
+        else:
+            # 自定义格式
+            column_format = self.ui.column_format_edit.text()
+            if not column_format:
+                self._logger.warning("未指定自定义格式的列定义")
+                QMessageBox.warning(self, "警告", "请先在列定义框中指定数据格式！")
                 return
-                    
-                self.log_message(f"正在加载自定义格式文件：{file_path}")
-                self.log_message(f"使用列定义：{column_format}")
-                success, msg = self.data_processor.load_custom_data(file_path, column_format)
                 
-            self.ui.progressBar.setValue(50)
+            self._logger.info(f"正在加载自定义格式文件：{file_path}")
+            self._logger.info(f"使用列定义：{column_format}")
+            job = lambda report: self.data_processor.load_custom_data(file_path, column_format)
             
-            # 处理加载结果
-            if success:
-                self.measured_file = file_path
-                self.measured_points = self.data_processor.measured_points
-                point_count = len(self.measured_points)
-                self.log_message(f"成功加载实测点位：共 {point_count} 个点")
-                
-                # 显示点位信息
-                if point_count > 0:
-                    first_point = self.measured_points[0]
-                    self.log_message(f"第一个点位坐标：X={first_point[0]:.3f}, Y={first_point[1]:.3f}")
-                    last_point = self.measured_points[-1]
-                    self.log_message(f"最后一个点位坐标：X={last_point[0]:.3f}, Y={last_point[1]:.3f}")
-            else:
-                self.log_message(f"加载数据失败：{msg}", "ERROR")
-                QMessageBox.warning(self, "警告", msg)
-                
-            self.ui.progressBar.setValue(100)
-            self.ui.progressBar.setVisible(False)
-                
+        self._start_task(job, lambda result: self._on_measured_loaded(result, file_path), "加载实测数据失败")
+        
+    def _on_measured_loaded(self, result, file_path):
+        """实测数据加载完成
+        
+        Args:
+            result: (是否成功, 错误信息)
+            file_path: 实测数据文件路径
+        """
+        success, msg = result
+        if success:
+            self.measured_file = file_path
+            # 直接引用处理器中的(N, 2)坐标数组，不再转换为元组列表
+            self.measured_points = self.data_processor.measured_xy
+            point_count = len(self.measured_points)
+            self._logger.info(f"成功加载实测点位：共 {point_count} 个点")
+            
+            # 显示点位信息
+            if point_count > 0:
+                first_point = self.measured_points[0]
+                self._logger.info(f"第一个点位坐标：X={first_point[0]:.3f}, Y={first_point[1]:.3f}")
+                last_point = self.measured_points[-1]
+                self._logger.info(f"最后一个点位坐标：X={last_point[0]:.3f}, Y={last_point[1]:.3f}")
+        else:
+            self._logger.error(f"加载数据失败：{msg}")
+            QMessageBox.warning(self, "警告", msg)
+            
+    def _start_task(self, func, on_finished, error_prefix, *args, com=False):
+        """在后台线程中执行耗时任务
+        
+        任务执行期间禁用操作按钮并显示进度条，界面保持响应；任务结束后在主线程中调用on_finished。
+        调用COM接口的任务统一在CAD线程中执行，保证CAD处理器的COM对象始终在同一线程中使用。
+        
+        Args:
+            func: 任务函数，第一个参数为进度回调
+            on_finished: 任务成功时的回调，参数为任务函数的返回值
+            error_prefix: 任务失败时的错误信息前缀
+            *args: 任务函数的其余参数
+            com: 任务是否调用COM接口
+        """
+        worker = Worker(func, *args, com=com)
+        worker.signals.progress.connect(self._set_progress)
+        worker.signals.message.connect(lambda message, level: self._logger.log(level, message))
+        worker.signals.finished.connect(lambda result: self._finish_task(worker, on_finished, result))
+        worker.signals.error.connect(lambda msg: self._fail_task(worker, error_prefix, msg))
+        # 保持引用直到任务结束，避免信号对象被提前回收
+        self._workers.add(worker)
+        
+        self._set_busy(True)
+        self._set_progress(0)
+        self.ui.progressBar.setVisible(True)
+        (self._com_pool if com else QThreadPool.globalInstance()).start(worker)
+        
+    def _finish_task(self, worker, on_finished, result):
+        """后台任务成功结束
+        
+        Args:
+            worker: 后台任务
+            on_finished: 任务成功时的回调
+            result: 任务函数的返回值
+        """
+        self._end_task(worker)
+        try:
+            on_finished(result)
         except Exception as e:
-            error_msg = f"加载实测数据失败：{str(e)}"
-            self.log_message(error_msg, "ERROR")
+            error_msg = f"处理任务结果失败：{str(e)}"
+            self._logger.error(error_msg)
             QMessageBox.critical(self, "错误", error_msg)
-            self.ui.progressBar.setVisible(False)
+            
+    def _fail_task(self, worker, error_prefix, msg):
+        """后台任务执行失败
+        
+        Args:
+            worker: 后台任务
+            error_prefix: 错误信息前缀
+            msg: 异常信息
+        """
+        self._end_task(worker)
+        error_msg = f"{error_prefix}：{msg}"
+        self._logger.error(error_msg)
+        QMessageBox.critical(self, "错误", error_msg)
+        
+    def _end_task(self, worker):
+        """恢复任务开始前的界面状态
+        
+        Args:
+            worker: 已结束的后台任务
+        """
+        self._workers.discard(worker)
+        self.ui.progressBar.setVisible(False)
+        self._set_busy(False)
+        
+    def _set_progress(self, value):
+        """更新进度条，进度未变化时不调用setValue
+        
+        Args:
+            value: 进度百分比
+        """
+        if value == self._last_progress:
+            return
+        self._last_progress = value
+        self.ui.progressBar.setValue(value)
+        
+    def _set_busy(self, busy):
+        """后台任务执行期间禁用会访问CAD或数据的按钮
+        
+        Args:
+            busy: 是否有任务正在执行
+        """
+        for button in (self.ui.open_cad_btn, self.ui.refresh_layer_btn, self.ui.select_circle_btn,
+                       self.ui.extract_cass_btn, self.ui.load_design_points_btn,
+                       self.ui.load_measured_btn, self.ui.match_points_btn,
+                       self.ui.calculate_deviation_btn, self.ui.statistics_btn,
+                       self.ui.export_statistics_btn, self.ui.draw_deviation_btn):
+            button.setEnabled(not busy)
             
     def match_points(self):
-        """匹配点位"""
+        """匹配点位（在后台线程中执行）"""
         # 分别检查设计点位和实测点位
-        if not self.design_points:
-            self.log_message("未加载设计点位数据", "WARNING")
+        if len(self.design_points) == 0:
+            self._logger.warning("未加载设计点位数据")
             QMessageBox.warning(self, "警告", "请先提取设计点位数据！")
             return
             
-        if not self.measured_points:
-            self.log_message("未加载实测点位数据", "WARNING")
+        if len(self.measured_points) == 0:
+            self._logger.warning("未加载实测点位数据")
             QMessageBox.warning(self, "警告", "请先加载实测点位数据！")
             return
             
-        try:
-            success = False
-            if self.ui.point_number_radio.isChecked():
-                # 按点号匹配
-                self.log_message("正在按点号匹配点位...")
-                success = self.data_processor.match_by_point_number()
-            elif self.ui.order_radio.isChecked():
-                # 按顺序匹配
-                self.log_message("正在按顺序匹配点位...")
-                success = self.data_processor.match_by_sequence()
-            elif self.ui.distance_radio.isChecked():
-                # 按距离匹配
-                try:
-                    distance = float(self.ui.distance_threshold.text())
-                    if distance <= 0:
-                        self.log_message("距离阈值必须大于0", "ERROR")
-                        QMessageBox.warning(self, "警告", "请输入大于0的距离阈值！")
-                        return
-                        
-                    self.log_message(f"正在按距离匹配点位（阈值：{distance}mm）...")
-                    success = self.data_processor.match_by_distance(distance)
-                except ValueError:
-                    self.log_message("距离阈值格式错误", "ERROR")
-                    QMessageBox.warning(self, "警告", "请输入有效的距离阈值！")
-                    return
-            else:
-                self.log_message("未选择匹配方式", "WARNING")
-                QMessageBox.warning(self, "警告", "请选择匹配方式！")
-                return
-                
-            if success:
-                matched_count = len(self.data_processor.get_matched_points())
-                self.log_message(f"点位匹配完成，共匹配 {matched_count} 个点")
-                QMessageBox.information(self, "成功", f"点位匹配完成，共匹配 {matched_count} 个点！")
-            else:
-                self.log_message("点位匹配失败", "ERROR")
-                QMessageBox.warning(self, "警告", "点位匹配失败，请检查匹配方式和数据！")
-        except Exception as e:
-            error_msg = f"匹配点位失败：{str(e)}"
-            self.log_message(error_msg, "ERROR")
-            QMessageBox.critical(self, "错误", error_msg)
-            
-    def calculate_deviation(self):
-        """计算偏差并获取建议的箭头比例"""
-        try:
-            # 检查是否已匹配点位
-            if not self.data_processor.get_matched_points():
-                self.log_message("请先匹配点位", "WARNING")
-                QMessageBox.warning(self, "警告", "请先执行点位匹配！")
+        if self.ui.point_number_radio.isChecked():
+            # 按点号匹配
+            self._logger.info("正在按点号匹配点位...")
+            job = lambda report: self.data_processor.match_by_point_number()
+        elif self.ui.order_radio.isChecked():
+            # 按顺序匹配
+            self._logger.info("正在按顺序匹配点位...")
+            job = lambda report: self.data_processor.match_by_sequence()
+        elif self.ui.distance_radio.isChecked():
+            # 按距离匹配
+            try:
+                distance = float(self.ui.distance_threshold.text())
+            except ValueError:
+                self._logger.error("距离阈值格式错误")
+                QMessageBox.warning(self, "警告", "请输入有效的距离阈值！")
                 return
-                
-            # 计算偏差
-            if not self.data_processor.calculate_deviations():
-                self.log_message("计算偏差失败", "ERROR")
-                QMessageBox.critical(self, "错误", "计算偏差失败！")
+            if distance <= 0:
+                self._logger.error("距离阈值必须大于0")
+                QMessageBox.warning(self, "警告", "请输入大于0的距离阈值！")
                 return
                 
-            # 获取建议的箭头比例
-            arrow_scale = self.data_processor.get_arrow_scale()
+            # 加速匹配：跳过最优分配，使用最近点贪心匹配（安装numba时为编译内核）
+            fast = self.ui.fast_match_check.isChecked()
+            self._logger.info(f"正在按距离匹配点位（阈值：{distance}mm{'，加速匹配' if fast else ''}）...")
+            job = lambda report: self.data_processor.match_by_distance(distance, optimal=not fast)
+        else:
+            self._logger.warning("未选择匹配方式")
+            QMessageBox.warning(self, "警告", "请选择匹配方式！")
+            return
             
-            # 更新界面上的箭头比例
-            self.ui.arrow_scale_edit.setText(f"{arrow_scale:.3f}")
+        self._start_task(job, self._on_points_matched, "匹配点位失败")
+        
+    def _on_points_matched(self, success):
+        """点位匹配完成
+        
+        Args:
+            success: 是否匹配成功
+        """
+        if success:
+            matched_count = len(self._matched_points())
+            self._logger.info(f"点位匹配完成，共匹配 {matched_count} 个点")
+            QMessageBox.information(self, "成功", f"点位匹配完成，共匹配 {matched_count} 个点！")
+        else:
+            self._logger.error("点位匹配失败")
+            QMessageBox.warning(self, "警告", "点位匹配失败，请检查匹配方式和数据！")
             
-            # 更新预览
-            self.apply_style()
+    def _matched_points(self):
+        """获取匹配点对数组，匹配结果未变化时复用上次拼接的数组
+        
+        DataProcessor.get_matched_points每次调用都会拼接出新数组；
+        每次匹配都会重新赋值设计、实测坐标数组，因此按数组对象标识判断匹配结果是否变化。
+        
+        Returns:
+            np.ndarray: 形状为(N, 2, 2)的匹配点对数组，调用方不应修改
+        """
+        dp = self.data_processor
+        key = (dp.matched_design_xy, dp.matched_measured_xy)
+        cache = self._matched_cache
+        if cache is None or cache[0][0] is not key[0] or cache[0][1] is not key[1]:
+            cache = self._matched_cache = (key, dp.get_matched_points())
+        return cache[1]
+        
+    def calculate_deviation(self):
+        """计算偏差并获取建议的箭头比例（在后台线程中执行）"""
+        # 检查是否已匹配点位
+        if len(self._matched_points()) == 0:
+            self._logger.warning("请先匹配点位")
+            QMessageBox.warning(self, "警告", "请先执行点位匹配！")
+            return
             
-            self.log_message("偏差计算完成，已更新建议的箭头比例")
+        self._start_task(self._deviation_job, self._on_deviation_calculated, "计算偏差失败")
+        
+    def _deviation_job(self, report):
+        """计算偏差和建议的箭头比例（在后台线程中执行）
+        
+        Args:
+            report: 进度回调
             
-        except Exception as e:
-            logger.error(f"计算偏差失败: {e}", exc_info=True)
-            QMessageBox.critical(self, "错误", f"计算偏差失败：{str(e)}")
+        Returns:
+            Optional[float]: 建议的箭头比例，计算偏差失败时返回None
+        """
+        if not self.data_processor.calculate_deviations():
+            return None
+        report(80)
+        return self.data_processor.get_arrow_scale()
+        
+    def _on_deviation_calculated(self, arrow_scale):
+        """偏差计算完成
+        
+        Args:
+            arrow_scale: 建议的箭头比例，计算偏差失败时为None
+        """
+        if arrow_scale is None:
+            self._logger.error("计算偏差失败")
+            QMessageBox.critical(self, "错误", "计算偏差失败！")
+            return
             
+        # 更新界面上的箭头比例
+        self.ui.arrow_scale_edit.setText(f"{arrow_scale:.3f}")
+        
+        # 更新预览
+        self.apply_style()
+        
+        self._logger.info("偏差计算完成，已更新建议的箭头比例")
+        
     def draw_deviation(self):
         """绘制偏差数据"""
         try:
             # 检查是否已计算偏差
             if not self.data_processor.get_deviations():
-                self.log_message("请先计算偏差", "WARNING")
+                self._logger.warning("请先计算偏差")
                 QMessageBox.warning(self, "警告", "请先计算偏差！")
                 return
                 
-            # 获取当前样式设置
-            try:
-                # 使用circle_diameter_edit中的值作为桩基直径
-                pile_diameter = float(self.ui.circle_diameter_edit.text())
-                axis_scale = float(self.ui.axis_scale_edit.text())
-                arrow_scale = float(self.ui.arrow_scale_edit.text())
-                main_text_scale = float(self.ui.main_text_scale_edit.text())
-                axis_label_scale = float(self.ui.axis_label_scale_edit.text())
-                angle_text_scale = float(self.ui.angle_text_scale_edit.text())
-            except ValueError:
-                self.log_message("样式参数格式错误，将使用默认值", "WARNING")
+            # 获取当前样式设置（使用circle_diameter_edit中的值作为桩基直径）
+            style = (
+                self._pile_diameter,
+                self._axis_scale,
+                self._arrow_scale,
+                self._main_text_scale,
+                self._axis_label_scale,
+                self._angle_text_scale
+            )
+            if None not in style:
+                pile_diameter, axis_scale, arrow_scale, main_text_scale, axis_label_scale, angle_text_scale = style
+            else:
+                self._logger.warning("样式参数格式错误，将使用默认值")
                 # 如果转换失败，使用默认值
                 pile_diameter = 1000
                 axis_scale = 0.5
@@ -556,6 +820,22 @@ class MainWindow(QMainWindow):
                 axis_label_scale = 1.0
                 angle_text_scale = 1.0
                 
+            # 样式、图纸和匹配数据都与上次成功绘制时相同时先确认，避免误操作重复绘制；
+            # 用户可能已在AutoCAD中撤销或删除了上次的绘制结果，因此仍允许重新绘制
+            dp = self.data_processor
+            draw_fp = ((pile_diameter, axis_scale, arrow_scale, main_text_scale, axis_label_scale, angle_text_scale),
+                       self.cad_file, dp.matched_design_xy, dp.matched_measured_xy, dp.matched_z)
+            if self._is_last_draw(draw_fp):
+                reply = QMessageBox.question(
+                    self, "确认",
+                    "样式和数据均未变化，偏差已绘制。\n是否仍要重新绘制？",
+                    QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+                    QMessageBox.StandardButton.No
+                )
+                if reply != QMessageBox.StandardButton.Yes:
+                    self._logger.info("样式和数据均未变化，取消重复绘制")
+                    return
+                
             # 更新可视化器样式
             success = self.visualizer.update_style(
                 pile_diameter=pile_diameter,
@@ -567,19 +847,23 @@ class MainWindow(QMainWindow):
             )
             
             if not success:
-                self.log_message("更新样式失败", "ERROR")
+                self._logger.error("更新样式失败")
                 return
                 
             # 绘制偏差
-            matched_points = self.data_processor.get_matched_points()
+            matched_points = self._matched_points()
             # 获取高程信息
             matched_elevations = self.data_processor.get_matched_elevations()
             
-            self.log_message(f"正在绘制偏差，共 {len(matched_points)} 个点...")
-            if matched_elevations:
-                self.log_message(f"包含高程信息，将绘制桩基标高")
+            self._logger.info(f"正在绘制偏差，共 {len(matched_points)} 个点...")
+            if len(matched_elevations) > 0:
+                self._logger.info(f"包含高程信息，将绘制桩基标高")
             
-            if self.visualizer.draw_deviation(
+            # 在后台CAD线程中绘制，完成后回到主线程提示结果；
+            # 绘制期间禁用其他访问CAD或数据的按钮，避免中途切换图纸或开始选择
+            self._set_busy(True)
+            self._pending_draw_fp = draw_fp
+            self.visualizer.draw_deviation_async(
                 matched_points, 
                 pile_diameter, 
                 axis_scale, 
@@ -587,91 +871,163 @@ class MainWindow(QMainWindow):
                 main_text_scale,
                 axis_label_scale,
                 angle_text_scale,
-                elevations=matched_elevations  # 传递高程信息
-            ):
-                self.log_message("偏差绘制完成")
+                elevations=matched_elevations,  # 传递高程信息
+                callback=self._on_deviation_drawn
+            )
+        except Exception as e:
+            # 绘制按钮只在没有任务执行时可用，出错时可以直接恢复按钮
+            self._set_busy(False)
+            error_msg = f"绘制偏差失败：{str(e)}"
+            self._logger.error(error_msg)
+            QMessageBox.critical(self, "错误", error_msg)
+            
+    def _on_deviation_drawn(self, future):
+        """后台偏差绘制完成回调
+        
+        Args:
+            future: 绘制任务的Future，结果为是否成功
+        """
+        self._set_busy(False)
+        try:
+            if future.result():
+                self._last_draw_fp = self._pending_draw_fp
+                self._logger.info("偏差绘制完成")
                 QMessageBox.information(self, "完成", "偏差数据绘制完成！")
             else:
-                self.log_message("偏差绘制失败", "ERROR")
+                self._logger.error("偏差绘制失败")
                 QMessageBox.critical(self, "错误", "偏差数据绘制失败！")
         except Exception as e:
             error_msg = f"绘制偏差失败：{str(e)}"
-            self.log_message(error_msg, "ERROR")
+            self._logger.error(error_msg)
             QMessageBox.critical(self, "错误", error_msg)
             
+    def _is_last_draw(self, draw_fp):
+        """判断绘制参数是否与上次成功绘制时相同
+        
+        匹配数据每次匹配都会生成新数组，按对象标识比较即可；
+        指纹中保留了数组引用，旧数组不会被回收，标识不会被新数组复用。
+        
+        Args:
+            draw_fp: (样式参数, CAD文件, 设计点坐标, 实测点坐标, 高程)
+            
+        Returns:
+            bool: 是否相同
+        """
+        last = self._last_draw_fp
+        if last is None or last[:2] != draw_fp[:2]:
+            return False
+        return all(a is b for a, b in zip(last[2:], draw_fp[2:]))
+        
     def statistics_deviation(self):
-        """统计偏差数据"""
-        if not self.design_points or not self.measured_points:
+        """统计偏差数据（在后台线程中执行）"""
+        if len(self.design_points) == 0 or len(self.measured_points) == 0:
             QMessageBox.warning(self, "警告", "请先完成点位匹配！")
             return
             
-        try:
-            stats = self.data_processor.calculate_statistics()
-            msg = f"偏差统计结果：\n"
-            msg += f"总点数：{stats['total_points']}\n"
-            msg += f"最大偏差：{stats['max_deviation']:.2f}mm\n"
-            msg += f"最小偏差：{stats['min_deviation']:.2f}mm\n"
-            msg += f"平均偏差：{stats['mean_deviation']:.2f}mm\n"
-            msg += f"标准差：{stats['std_deviation']:.2f}mm\n"
-            msg += f"超限点数：{stats['exceeded_points']}"
-            
-            QMessageBox.information(self, "统计结果", msg)
-            self.log_message("偏差数据统计完成")
-        except Exception as e:
-            logger.error(f"统计偏差数据失败: {e}")
-            QMessageBox.critical(self, "错误", f"统计偏差数据失败：{str(e)}")
+        self._start_task(lambda report: self.data_processor.calculate_statistics(),
+                         self._show_statistics, "统计偏差数据失败")
+        
+    def _show_statistics(self, stats):
+        """显示偏差统计结果
+        
+        Args:
+            stats: 统计结果，统计失败时为None
+        """
+        if not stats:
+            self._logger.error("统计偏差数据失败")
+            QMessageBox.warning(self, "警告", "统计偏差数据失败，请先计算偏差！")
+            return
             
+        msg = f"偏差统计结果：\n"
+        msg += f"总点数：{stats['total_points']}\n"
+        msg += f"最大偏差：{stats['max_deviation']:.2f}mm\n"
+        msg += f"最小偏差：{stats['min_deviation']:.2f}mm\n"
+        msg += f"平均偏差：{stats['mean_deviation']:.2f}mm\n"
+        msg += f"标准差：{stats['std_deviation']:.2f}mm\n"
+        msg += f"超限点数：{stats['exceeded_points']}"
+        
+        QMessageBox.information(self, "统计结果", msg)
+        self._logger.info("偏差数据统计完成")
+        
     def export_statistics(self):
-        """导出统计数据"""
-        if not self.design_points or not self.measured_points:
+        """导出统计数据（在后台线程中执行）"""
+        if len(self.design_points) == 0 or len(self.measured_points) == 0:
             QMessageBox.warning(self, "警告", "请先完成点位匹配！")
             return
             
+        file_path = self._choose_file(
+            True, "statistics",
+            "导出统计数据",
+            "Excel文件 (*.xlsx);;所有文件 (*.*)"
+        )
+        if not file_path:
+            return
+            
+        self._start_task(lambda report: self.data_processor.export_statistics(file_path),
+                         lambda success: self._on_statistics_exported(success, file_path), "导出统计数据失败")
+        
+    def _on_statistics_exported(self, success, file_path):
+        """统计数据导出完成
+        
+        Args:
+            success: 是否导出成功
+            file_path: 输出文件路径
+        """
+        if success:
+            self._logger.info(f"成功导出统计数据：{file_path}")
+        else:
+            QMessageBox.warning(self, "警告", "导出统计数据失败")
+            
+    def _on_style_text_changed(self, attr, text):
+        """样式输入框文本变化时解析数值
+        
+        Args:
+            attr: 保存解析结果的属性名
+            text: 输入框文本
+        """
         try:
-            file_path, _ = QFileDialog.getSaveFileName(
-                self,
-                "导出统计数据",
-                "",
-                "Excel文件 (*.xlsx);;所有文件 (*.*)"
-            )
-            if file_path:
-                success = self.data_processor.export_statistics(file_path)
-                if success:
-                    self.log_message(f"成功导出统计数据：{file_path}")
-                else:
-                    QMessageBox.warning(self, "警告", "导出统计数据失败")
-        except Exception as e:
-            logger.error(f"导出统计数据失败: {e}")
-            QMessageBox.critical(self, "错误", f"导出统计数据失败：{str(e)}")
+            setattr(self, attr, float(text))
+        except ValueError:
+            setattr(self, attr, None)
             
     def reset_style(self):
         """重置样式设置"""
         self.init_ui_state()
-        self.log_message("重置样式设置为默认值")
+        self._logger.info("重置样式设置为默认值")
         
     def apply_style(self):
+        """应用样式设置（延迟50毫秒执行，合并连续的多次调用）"""
+        self._style_timer.start(50)
+        
+    def _do_apply_style(self):
         """应用样式设置"""
         try:
-            # 获取样式参数
-            try:
-                pile_diameter = float(self.ui.circle_diameter_edit.text()) if self.ui.circle_diameter_edit.text() else 1000
-                axis_scale = float(self.ui.axis_scale_edit.text())
-                arrow_scale = float(self.ui.arrow_scale_edit.text())  # 使用用户输入的箭头比例
-                main_text_scale = float(self.ui.main_text_scale_edit.text())
-                axis_label_scale = float(self.ui.axis_label_scale_edit.text())
-                angle_text_scale = float(self.ui.angle_text_scale_edit.text())
-            except ValueError as e:
-                self.log_message("样式参数格式错误", "ERROR")
+            # 获取样式参数（桩基直径为空时使用默认值1000）
+            style = (
+                self._pile_diameter if self.ui.circle_diameter_edit.text() else 1000,
+                self._axis_scale,
+                self._arrow_scale,  # 使用用户输入的箭头比例
+                self._main_text_scale,
+                self._axis_label_scale,
+                self._angle_text_scale
+            )
+            if None in style:
+                self._logger.error("样式参数格式错误")
                 QMessageBox.warning(self, "警告", "请输入有效的数值！")
                 return
+            pile_diameter, axis_scale, arrow_scale, main_text_scale, axis_label_scale, angle_text_scale = style
             
             # 检查参数有效性
             if pile_diameter <= 0 or axis_scale <= 0 or arrow_scale <= 0 or \
                main_text_scale <= 0 or axis_label_scale <= 0 or angle_text_scale <= 0:
-                self.log_message("样式参数必须大于0", "ERROR")
+                self._logger.error("样式参数必须大于0")
                 QMessageBox.warning(self, "警告", "所有样式参数必须大于0！")
                 return
-            
+                
+            # 样式参数与上次应用的相同时无需重绘
+            if style == self._last_style:
+                return
+                
             # 更新预览
             logger.info(f"开始更新样式预览... 桩基直径: {pile_diameter}, 箭头比例: {arrow_scale}")
             self.preview_scene.draw_deviation(
@@ -694,56 +1050,68 @@ class MainWindow(QMainWindow):
             )
             
             if success:
-                self.log_message(f"样式设置已更新 - 桩基直径: {pile_diameter}mm, 箭头比例: {arrow_scale}")
+                self._last_style = style
+                self._logger.info(f"样式设置已更新 - 桩基直径: {pile_diameter}mm, 箭头比例: {arrow_scale}")
             else:
-                self.log_message("样式设置保存失败", "WARNING")
+                self._logger.warning("样式设置保存失败")
                 
         except Exception as e:
             logger.error(f"应用样式设置失败: {e}", exc_info=True)
             QMessageBox.critical(self, "错误", f"应用样式设置失败：{str(e)}")
             
-    def log_message(self, message, level="INFO"):
-        """记录日志消息
+    def _append_log(self, created, levelno, message):
+        """将日志记录加入日志控件的待写入队列（在主线程中执行）
         
         Args:
+            created: 日志记录的创建时间戳
+            levelno: 日志级别
             message: 日志消息
-            level: 日志级别，可选值：INFO, WARNING, ERROR
         """
-        from datetime import datetime
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        
-        # 根据日志级别设置不同的前缀和颜色
-        if level == "WARNING":
-            prefix = "警告"
-            color = "orange"
-        elif level == "ERROR":
-            prefix = "错误"
-            color = "red"
-        else:  # INFO
-            prefix = "信息"
-            color = "black"
-            
-        # 格式化日志消息
-        formatted_msg = f'<div style="color: {color}">[{timestamp}] [{prefix}] {message}</div>'
-        
-        # 添加到日志控件
-        self.ui.log_text.append(formatted_msg)
-        
-        # 根据级别调用logger
-        if level == "WARNING":
-            logger.warning(message)
-        elif level == "ERROR":
-            logger.error(message)
-        else:
-            logger.info(message)
+        timestamp = datetime.fromtimestamp(created).strftime("%Y-%m-%d %H:%M:%S")
+        prefix, color = self._LOG_STYLES.get(levelno, self._LOG_STYLES[logging.INFO])
+        
+        # 短时间内的多条消息合并为一次写入日志控件
+        self._pending_logs.append(self._LOG_FMT.format(c=color, t=timestamp, p=prefix, m=message))
+        if not self._log_timer.isActive():
+            self._log_timer.start()
+            
+    def _flush_log(self):
+        """将待写入的日志消息一次性追加到日志控件末尾并滚动到底部"""
+        if not self._pending_logs:
+            return
             
+        log_text = self.ui.log_text
+        document = log_text.document()
+        log_text.setUpdatesEnabled(False)
+        try:
+            self._log_cursor.movePosition(QTextCursor.MoveOperation.End)
+            # 放在同一个编辑块中，文档只重新布局一次
+            self._log_cursor.beginEditBlock()
+            for msg in self._pending_logs:
+                if not document.isEmpty():
+                    self._log_cursor.insertBlock()
+                self._log_cursor.insertHtml(msg)
+            self._log_cursor.endEditBlock()
+            self._pending_logs.clear()
+        finally:
+            log_text.setUpdatesEnabled(True)
+        scroll_bar = log_text.verticalScrollBar()
+        scroll_bar.setValue(scroll_bar.maximum())
+        
+    def closeEvent(self, event):
+        """关闭窗口时停止后台CAD绘制线程和尚未开始的后台任务"""
+        self.visualizer.shutdown()
+        self._com_pool.clear()
+        self._com_pool.waitForDone(3000)
+        self._logger.removeHandler(self._log_handler)
+        super().closeEvent(event)
+        
     def load_design_points(self):
         """加载设计点位数据（CASS格式）"""
         # 弹出文件选择对话框
-        file_path, _ = QFileDialog.getOpenFileName(
-            self,
+        file_path = self._choose_file(
+            False, "design",
             "选择设计点位文件",
-            "",
             "CASS文件 (*.dat);;所有文件 (*.*)"
         )
         
@@ -752,103 +1120,43 @@ class MainWindow(QMainWindow):
             
         try:
             # 初始化进度条
-            self.ui.progressBar.setValue(0)
+            self._set_progress(0)
             self.ui.progressBar.setVisible(True)
             
             # 开始加载数据
-            self.log_message(f"正在加载设计点位文件：{file_path}")
+            self._logger.info(f"正在加载设计点位文件：{file_path}")
             
             # 使用数据处理器加载CASS格式数据
             success, msg = self.data_processor.load_cass_data(file_path, is_design=True)
             
-            self.ui.progressBar.setValue(50)
+            self._set_progress(50)
             
             if success:
                 # 获取点位数据
-                self.design_points = self.data_processor.design_points
+                # 直接引用处理器中的(N, 2)坐标数组，不再转换为元组列表
+                self.design_points = self.data_processor.design_xy
                 point_count = len(self.design_points)
-                self.log_message(f"成功加载设计点位：共 {point_count} 个点")
+                self._logger.info(f"成功加载设计点位：共 {point_count} 个点")
                 
                 # 显示点位信息
                 if point_count > 0:
                     first_point = self.design_points[0]
-                    self.log_message(f"第一个点位坐标：X={first_point[0]:.3f}, Y={first_point[1]:.3f}")
+                    self._logger.info(f"第一个点位坐标：X={first_point[0]:.3f}, Y={first_point[1]:.3f}")
                     last_point = self.design_points[-1]
-                    self.log_message(f"最后一个点位坐标：X={last_point[0]:.3f}, Y={last_point[1]:.3f}")
+                    self._logger.info(f"最后一个点位坐标：X={last_point[0]:.3f}, Y={last_point[1]:.3f}")
                     
                     # 更新UI状态
                     QMessageBox.information(self, "成功", f"已成功加载 {point_count} 个设计点位！")
             else:
-                self.log_message(f"加载设计点位失败：{msg}", "ERROR")
+                self._logger.error(f"加载设计点位失败：{msg}")
                 QMessageBox.warning(self, "警告", f"加载设计点位失败：{msg}")
                 
-            self.ui.progressBar.setValue(100)
+            self._set_progress(100)
             self.ui.progressBar.setVisible(False)
                 
         except Exception as e:
             error_msg = f"加载设计点位失败：{str(e)}"
-            self.log_message(error_msg, "ERROR")
+            self._logger.error(error_msg)
             QMessageBox.critical(self, "错误", error_msg)
             self.ui.progressBar.setVisible(False)
             
-    def extract_by_layer(self):
-        """按图层提取设计点位"""
-        try:
-            layer_name = self.ui.layer_name_edit.text().strip()
-            if not layer_name:
-                self.log_message("请输入图层名称", "WARNING")
-                QMessageBox.warning(self, "警告", "请输入图层名称！")
-                return
-                
-            # 提取点位
-            success, circles = self.cad_handler.extract_circles_by_layer(layer_name)
-            if not success:
-                self.log_message("按图层提取点位失败", "ERROR")
-                QMessageBox.critical(self, "错误", "提取点位失败！")
-                return
-                
-            # 更新圆信息显示
-            if circles:
-                diameter = circles[0].get('diameter', 0)  # 获取第一个圆的直径
-                self.ui.circle_diameter_edit.setText(f"{diameter:.2f}")
-                self.ui.circle_count_edit.setText(str(len(circles)))
-                self.ui.pile_diameter_edit.setText(f"{diameter:.2f}")  # 同步更新样式设置中的桩基直径
-                
-            # 提取坐标点
-            points = [(circle['center'].x, circle['center'].y) for circle in circles]
-            self.data_processor.design_points = points
-            
-            self.log_message(f"按图层提取点位成功，共{len(points)}个点")
-            QMessageBox.information(self, "成功", f"成功提取{len(points)}个点！")
-            
-        except Exception as e:
-            self.log_message(f"按图层提取点位失败: {e}", "ERROR")
-            QMessageBox.critical(self, "错误", f"提取点位失败：{str(e)}")
-            
-    def extract_by_select(self):
-        """按选择提取设计点位"""
-        try:
-            # 提取点位
-            success, circles = self.cad_handler.extract_circles_by_select()
-            if not success:
-                self.log_message("按选择提取点位失败", "ERROR")
-                QMessageBox.critical(self, "错误", "提取点位失败！")
-                return
-                
-            # 更新圆信息显示
-            if circles:
-                diameter = circles[0].get('diameter', 0)  # 获取第一个圆的直径
-                self.ui.circle_diameter_edit.setText(f"{diameter:.2f}")
-                self.ui.circle_count_edit.setText(str(len(circles)))
-                self.ui.pile_diameter_edit.setText(f"{diameter:.2f}")  # 同步更新样式设置中的桩基直径
-                
-            # 提取坐标点
-            points = [(circle['center'].x, circle['center'].y) for circle in circles]
-            self.data_processor.design_points = points
-            
-            self.log_message(f"按选择提取点位成功，共{len(points)}个点")
-            QMessageBox.information(self, "成功", f"成功提取{len(points)}个点！")
-            
-        except Exception as e:
-            self.log_message(f"按选择提取点位失败: {e}", "ERROR")
-            QMessageBox.critical(self, "错误", f"提取点位失败：{str(e)}") 
\ No newline at end of file
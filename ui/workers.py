@@ -0,0 +1,85 @@
+"""
+后台任务模块
+"""
+import logging
+from typing import Any, Callable, Optional
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+from utils.logger import get_logger
+from utils.com_utils import enter_com_apartment
+
+# 创建模块的logger
+logger = get_logger(__name__)
+
+def create_com_pool() -> QThreadPool:
+    """创建执行CAD任务的线程池
+    
+    COM对象只能在创建它的线程中使用，因此线程池只保留一个常驻线程：
+    CAD处理器在该线程中连接AutoCAD后，后续任务可以继续使用同一组COM对象。
+    
+    Returns:
+        QThreadPool: 单线程且线程不过期的线程池
+    """
+    pool = QThreadPool()
+    pool.setMaxThreadCount(1)
+    pool.setExpiryTimeout(-1)
+    return pool
+
+class WorkerSignals(QObject):
+    """后台任务信号
+    
+    信号对象在主线程中创建，后台线程发出的信号会排队到主线程执行槽函数，
+    因此槽函数中可以直接更新界面控件。
+    """
+    progress = pyqtSignal(int)
+    message = pyqtSignal(str, int)
+    finished = pyqtSignal(object)
+    error = pyqtSignal(str)
+
+class Worker(QRunnable):
+    """在线程池中执行的后台任务
+    
+    任务函数的第一个参数为进度回调report(value, message, level)，
+    用于报告进度百分比和日志消息，其余参数按创建时传入的顺序传递。
+    """
+    
+    def __init__(self, func: Callable[..., Any], *args, com: bool = False):
+        """初始化后台任务
+        
+        Args:
+            func: 任务函数
+            *args: 任务函数的参数
+            com: 任务是否调用COM接口
+        """
+        super().__init__()
+        self.signals = WorkerSignals()
+        self._func = func
+        self._args = args
+        self._com = com
+        self._last_progress = -1
+        
+    def report(self, value: Optional[int] = None, message: Optional[str] = None, level: int = logging.INFO):
+        """报告任务进度
+        
+        Args:
+            value: 进度百分比，为None时不更新进度
+            message: 日志消息，为None时不记录
+            level: 日志级别，如logging.INFO
+        """
+        # 整数百分比变化时才发出信号
+        if value is not None and int(value) != self._last_progress:
+            self._last_progress = int(value)
+            self.signals.progress.emit(self._last_progress)
+        if message:
+            self.signals.message.emit(message, level)
+            
+    def run(self):
+        """执行任务，完成后发出finished信号，失败时发出error信号"""
+        try:
+            if self._com:
+                enter_com_apartment()
+            result = self._func(self.report, *self._args)
+        except Exception as e:
+            logger.error(f"后台任务执行失败: {e}")
+            self.signals.error.emit(str(e))
+        else:
+            self.signals.finished.emit(result)
@@ -1,17 +1,22 @@
 """
 COM工具模块
 """
+import threading
 import pythoncom
 import win32com.client
-import win32gui
-import win32con
-import ctypes
 from typing import Any, Callable
+from functools import wraps
 from utils.logger import get_logger
 
 # 创建模块的logger
 logger = get_logger(__name__)
 
+# AutoCAD应用程序的ProgID
+AUTOCAD_PROG_ID = "AutoCAD.Application"
+
+# 记录当前线程是否已进入COM单线程套间
+_com_state = threading.local()
+
 def initialize_com():
     """
     初始化COM环境
@@ -37,25 +42,81 @@ def uninitialize_com():
     except Exception as e:
         logger.error(f"COM环境释放失败: {e}")
 
+def enter_com_apartment():
+    """当前线程首次调用时初始化COM环境，此后保持到线程结束
+    
+    线程中创建的COM对象只在COM环境保持初始化期间有效，因此不在每次调用后释放；
+    线程结束时由系统回收COM环境。
+    """
+    if not getattr(_com_state, "initialized", False):
+        pythoncom.CoInitialize()
+        _com_state.initialized = True
+
 def ensure_com_initialized(func: Callable) -> Callable:
     """确保COM接口已初始化的装饰器
     
+    每个线程只初始化一次COM环境，不再每次调用都初始化和释放。
+    
     Args:
         func: 需要装饰的函数
         
     Returns:
         装饰后的函数
     """
+    @wraps(func)
     def wrapper(*args, **kwargs) -> Any:
         try:
-            # 初始化COM
-            pythoncom.CoInitialize()
-            # 执行原函数
-            result = func(*args, **kwargs)
-            # 清理COM
-            pythoncom.CoUninitialize()
-            return result
+            enter_com_apartment()
+            return func(*args, **kwargs)
         except Exception as e:
             logger.error(f"COM操作失败: {e}")
             raise
-    return wrapper 
\ No newline at end of file
+    return wrapper
+
+def get_autocad_application() -> Any:
+    """获取AutoCAD应用程序对象，优先使用早绑定接口
+    
+    早绑定通过gencache生成（并缓存到gen_py目录）类型库包装类，属性和方法直接按DISPID调用，
+    省去晚绑定每次访问时的GetIDsOfNames查找。生成失败时退回晚绑定。
+    
+    Returns:
+        Any: AutoCAD应用程序对象
+        
+    Raises:
+        Exception: 既无法连接已运行的AutoCAD也无法启动新实例时抛出
+    """
+    try:
+        # 优先连接已运行的AutoCAD实例
+        app = win32com.client.GetActiveObject(AUTOCAD_PROG_ID)
+    except Exception:
+        app = None
+        
+    try:
+        if app is None:
+            return win32com.client.gencache.EnsureDispatch(AUTOCAD_PROG_ID)
+        return win32com.client.gencache.EnsureDispatch(app._oleobj_)
+    except Exception as e:
+        logger.warning(f"生成AutoCAD早绑定接口失败，改用晚绑定: {e}")
+        if app is None:
+            app = win32com.client.Dispatch(AUTOCAD_PROG_ID)
+        return app
+
+def cast_entity(entity: Any, interface_name: str) -> Any:
+    """将早绑定的通用实体对象转换为具体接口
+    
+    早绑定模式下，遍历选择集得到的对象按IAcadEntity包装，无法直接访问Center、Radius等
+    子类属性；转换只替换Python包装类，不产生COM调用。晚绑定对象原样返回。
+    
+    Args:
+        entity: CAD实体对象
+        interface_name: 目标接口名称，如"IAcadCircle"
+        
+    Returns:
+        Any: 转换后的实体对象
+    """
+    if not isinstance(entity, win32com.client.DispatchBaseClass):
+        return entity
+    try:
+        return win32com.client.CastTo(entity, interface_name)
+    except Exception:
+        return entity
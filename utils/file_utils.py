@@ -2,13 +2,27 @@
 文件工具模块
 """
 import os
+from functools import lru_cache
 from config.settings import FILE_TYPES
-from utils.logger import logger
+from utils.logger import get_logger
+
+# 创建模块的logger
+logger = get_logger(__name__)
+
+# CASS文件前三行的起始标记
+_CASS_MARKERS = (b'CASS', b'*FPH', b'*ZD')
+# 判断CASS格式时读取的文件开头字节数
+_CASS_HEAD_BYTES = 1024
+
+# 扩展名到文件类型的反向索引
+_EXT_TO_TYPE = {ext.casefold(): file_type for file_type, extensions in FILE_TYPES.items() for ext in extensions}
 
 def is_cass_file(file_path):
     """
     判断是否为CASS格式文件
     
+    结果按(规范化路径, 修改时间, 文件大小)缓存，文件未变化时不再重复读取。
+    
     Args:
         file_path (str): 文件路径
         
@@ -16,12 +30,31 @@ def is_cass_file(file_path):
         bool: 是否为CASS格式文件
     """
     try:
-        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-            first_lines = [f.readline().strip() for _ in range(3)]
-            for line in first_lines:
-                if line.startswith('CASS') or line.startswith('*FPH') or line.startswith('*ZD'):
-                    return True
+        path = os.path.normcase(os.path.abspath(file_path))
+        stat = os.stat(path)
+    except Exception as e:
+        logger.error(f"检查CASS文件格式失败: {e}")
         return False
+    return _is_cass_file_cached(path, stat.st_mtime_ns, stat.st_size)
+
+@lru_cache(maxsize=512)
+def _is_cass_file_cached(file_path, mtime_ns, size):
+    """
+    读取文件开头判断是否为CASS格式文件
+    
+    Args:
+        file_path (str): 规范化后的文件路径
+        mtime_ns (int): 文件修改时间，仅作为缓存键
+        size (int): 文件大小，仅作为缓存键
+        
+    Returns:
+        bool: 是否为CASS格式文件
+    """
+    try:
+        # 以二进制方式只读取文件开头，不解码、不按行读取整行
+        with open(file_path, 'rb') as f:
+            head = f.read(_CASS_HEAD_BYTES)
+        return any(line.strip().startswith(_CASS_MARKERS) for line in head.split(b'\n', 3)[:3])
     except Exception as e:
         logger.error(f"检查CASS文件格式失败: {e}")
         return False
@@ -36,12 +69,10 @@ def get_file_type(file_path):
     Returns:
         str: 文件类型（'CAD', 'EXCEL', 'CSV', 'CASS'）
     """
-    ext = os.path.splitext(file_path)[1].lower()
-    
-    for file_type, extensions in FILE_TYPES.items():
-        if ext in extensions:
-            return file_type
-            
+    file_type = _EXT_TO_TYPE.get(os.path.splitext(file_path)[1].casefold())
+    if file_type:
+        return file_type
+        
     if is_cass_file(file_path):
         return 'CASS'
         
@@ -73,9 +104,11 @@ def create_directory_if_not_exists(directory):
         bool: 是否成功创建目录
     """
     try:
-        if not os.path.exists(directory):
-            os.makedirs(directory)
-            logger.info(f"创建目录: {directory}")
+        # 直接创建，目录已存在时由FileExistsError判断，省去一次存在性检查
+        os.makedirs(directory)
+        logger.info(f"创建目录: {directory}")
+        return True
+    except FileExistsError:
         return True
     except Exception as e:
         logger.error(f"创建目录失败: {e}")
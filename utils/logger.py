@@ -2,36 +2,41 @@
 日志工具模块
 """
 import os
+import sys
+import atexit
+import queue
+import threading
+import time
 import logging
+import logging.handlers
 from datetime import datetime
 from typing import Optional
 
-class Logger:
-    """日志管理类"""
-    
-    _instance = None
-    _loggers = {}  # 存储不同模块的logger
+# 日志文件保留天数
+_LOG_KEEP_DAYS = 14
+
+# 已创建的logger {模块名称: logger}
+_loggers = {}
+# 创建新logger时加锁，已创建的logger直接从字典读取
+_loggers_lock = threading.Lock()
+
+class _LoggerManager:
+    """日志管理类，模块导入时创建唯一实例"""
     
-    def __new__(cls):
-        if cls._instance is None:
-            cls._instance = super().__new__(cls)
-        return cls._instance
-        
     def __init__(self):
         """初始化日志管理器"""
-        if not hasattr(self, 'initialized'):
-            self._setup_base_config()
-            self.initialized = True
-            
+        self._setup_base_config()
+        
     def _setup_base_config(self):
         """配置基本日志系统"""
         # 创建logs目录
         log_dir = "logs"
-        if not os.path.exists(log_dir):
-            os.makedirs(log_dir)
+        os.makedirs(log_dir, exist_ok=True)
             
-        # 生成日志文件名
-        self.log_file = os.path.join(log_dir, f"app_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log")
+        # 每个进程写入自己的日志文件：多个实例同时打开同一文件时，Windows下轮转（重命名）会失败，
+        # 日志也会相互交错。长时间运行时每天零点轮转，启动时删除超过保留天数的旧日志
+        self.log_file = os.path.join(log_dir, f"app_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{os.getpid()}.log")
+        self._remove_old_logs(log_dir)
         
         # 配置日志格式
         self.formatter = logging.Formatter(
@@ -40,7 +45,9 @@ class Logger:
         )
         
         # 创建文件处理器
-        self.file_handler = logging.FileHandler(self.log_file, encoding='utf-8')
+        self.file_handler = logging.handlers.TimedRotatingFileHandler(
+            self.log_file, when='midnight', backupCount=_LOG_KEEP_DAYS, encoding='utf-8', delay=True
+        )
         self.file_handler.setFormatter(self.formatter)
         self.file_handler.setLevel(logging.DEBUG)
         
@@ -48,9 +55,36 @@ class Logger:
         self.console_handler = logging.StreamHandler()
         self.console_handler.setFormatter(self.formatter)
         self.console_handler.setLevel(logging.INFO)
+        
+        # 各模块的logger只把日志记录放入队列，由后台线程写入文件和控制台
+        self._log_queue = queue.Queue(-1)
+        self.queue_handler = logging.handlers.QueueHandler(self._log_queue)
+        self._listener = logging.handlers.QueueListener(
+            self._log_queue, self.file_handler, self.console_handler,
+            respect_handler_level=True
+        )
+        self._listener.start()
+        # 程序退出时写完队列中剩余的日志
+        atexit.register(self._listener.stop)
             
-    def get_logger(self, name: str) -> logging.Logger:
-        """获取指定名称的logger
+    @staticmethod
+    def _remove_old_logs(log_dir: str):
+        """删除超过保留天数的日志文件
+        
+        Args:
+            log_dir: 日志目录
+        """
+        expire_time = time.time() - _LOG_KEEP_DAYS * 86400
+        for entry in os.scandir(log_dir):
+            try:
+                if entry.is_file() and entry.name.startswith("app") and entry.stat().st_mtime < expire_time:
+                    os.remove(entry.path)
+            except OSError:
+                # 其他实例仍在写入的文件无法删除，跳过
+                pass
+                
+    def create_logger(self, name: str) -> logging.Logger:
+        """创建指定名称的logger并登记到_loggers
         
         Args:
             name: 模块名称
@@ -58,19 +92,20 @@ class Logger:
         Returns:
             logging.Logger: 日志记录器
         """
-        if name not in self._loggers:
-            logger = logging.getLogger(name)
-            logger.setLevel(logging.DEBUG)
-            logger.addHandler(self.file_handler)
-            logger.addHandler(self.console_handler)
-            # 防止日志重复
-            logger.propagate = False
-            self._loggers[name] = logger
-            
-        return self._loggers[name]
+        with _loggers_lock:
+            # 加锁后再检查一次，避免多个线程重复添加处理器
+            logger = _loggers.get(name)
+            if logger is None:
+                logger = logging.getLogger(name)
+                logger.setLevel(logging.DEBUG)
+                logger.addHandler(self.queue_handler)
+                # 防止日志重复
+                logger.propagate = False
+                _loggers[name] = logger
+            return logger
 
 # 创建全局日志管理器
-_logger_manager = Logger()
+_mgr = _LoggerManager()
 
 def get_logger(name: str = None) -> logging.Logger:
     """获取logger的便捷函数
@@ -82,11 +117,10 @@ def get_logger(name: str = None) -> logging.Logger:
         logging.Logger: 日志记录器
     """
     if name is None:
-        import inspect
-        frame = inspect.currentframe()
-        if frame is not None:
-            frame = frame.f_back
-        if frame is not None:
-            name = frame.f_globals.get('__name__', 'unknown')
-    
-    return _logger_manager.get_logger(name) 
\ No newline at end of file
+        # 直接取调用者栈帧的模块名，无需导入inspect
+        name = sys._getframe(1).f_globals.get('__name__', 'unknown')
+        
+    logger = _loggers.get(name)
+    if logger is None:
+        logger = _mgr.create_logger(name)
+    return logger 
\ No newline at end of file